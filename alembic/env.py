@@ -1,5 +1,6 @@
 import asyncio
 import os
+import re
 from logging.config import fileConfig
 
 from sqlalchemy import pool
@@ -7,7 +8,9 @@ from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
+from app.core.config import config as app_config
 from app.db.base import Base  # Import your Base
+from app.db.partitions import PARTITIONED_TABLE
 
 # this is the Alembic Config object
 config = context.config
@@ -25,14 +28,30 @@ db_url = os.getenv("DEV_DATABASE_URL")
 if db_url:
     config.set_main_option("sqlalchemy.url", db_url)
 
+# The task shards (app/db/shards.py) get the same migrations after the
+# directory database. Migrations that differ on a shard check
+# config.attributes["shard"], None on the directory database.
+database_urls = [
+    (None, config.get_main_option("sqlalchemy.url")),
+    *enumerate(app_config.TASK_SHARD_URLS),
+]
 
-def run_migrations_offline() -> None:
+# The hash partitions of tasks (c4a2e9d1f6b8, app/db/partitions.py) aren't
+# models, autogenerate would otherwise drop them
+PARTITION_NAME = re.compile(rf"{PARTITIONED_TABLE}_p\d+(_of_\d+)?")
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    return not (type_ == "table" and reflected and PARTITION_NAME.fullmatch(name))
+
+
+def run_migrations_offline(url: str) -> None:
     """Run migrations in 'offline' mode."""
-    url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
         literal_binds=True,
+        include_object=include_object,
         dialect_opts={"paramstyle": "named"},
     )
 
@@ -43,19 +62,22 @@ def run_migrations_offline() -> None:
 def do_run_migrations(connection: Connection) -> None:
     """The synchronous wrapper for running migrations."""
     context.configure(
-        connection=connection, target_metadata=target_metadata, compare_type=True
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
         context.run_migrations()
 
 
-async def run_migrations_online() -> None:
+async def run_migrations_online(url: str) -> None:
     """Run migrations in 'online' mode using AsyncEngine."""
 
     # Create the Async Engine
     connectable = async_engine_from_config(
-        config.get_section(config.config_ini_section),
+        {**config.get_section(config.config_ini_section), "sqlalchemy.url": url},
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
@@ -67,8 +89,10 @@ async def run_migrations_online() -> None:
     await connectable.dispose()
 
 
-if context.is_offline_mode():
-    run_migrations_offline()
-else:
-    # Use asyncio to run the async migration function
-    asyncio.run(run_migrations_online())
+for shard, url in database_urls:
+    config.attributes["shard"] = shard
+    if context.is_offline_mode():
+        run_migrations_offline(url)
+    else:
+        # Use asyncio to run the async migration function
+        asyncio.run(run_migrations_online(url))
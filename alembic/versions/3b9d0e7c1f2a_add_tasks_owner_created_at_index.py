@@ -0,0 +1,32 @@
+"""add a composite index on tasks for keyset pagination
+
+Revision ID: 3b9d0e7c1f2a
+Revises: 81f06fe9dffb
+Create Date: 2026-10-18 10:12:41.503276
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b9d0e7c1f2a"
+down_revision: Union[str, Sequence[str], None] = "81f06fe9dffb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_tasks_owner_id_created_at_id",
+        "tasks",
+        ["owner_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_owner_id_created_at_id", table_name="tasks")
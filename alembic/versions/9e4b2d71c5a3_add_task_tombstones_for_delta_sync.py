@@ -0,0 +1,53 @@
+"""add task tombstones and an updated_at index for delta sync
+
+Revision ID: 9e4b2d71c5a3
+Revises: 6a1c4f8e2d90
+Create Date: 2026-10-18 13:21:08.614203
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9e4b2d71c5a3"
+down_revision: Union[str, Sequence[str], None] = "6a1c4f8e2d90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_tasks_owner_id_updated_at_id",
+        "tasks",
+        ["owner_id", "updated_at", "id"],
+        unique=False,
+    )
+    op.create_table(
+        "task_tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_task_tombstones_owner_id_deleted_at_id",
+        "task_tombstones",
+        ["owner_id", "deleted_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_task_tombstones_owner_id_deleted_at_id", table_name="task_tombstones"
+    )
+    op.drop_table("task_tombstones")
+    op.drop_index("ix_tasks_owner_id_updated_at_id", table_name="tasks")
@@ -0,0 +1,52 @@
+"""drop the owner foreign keys on task shards
+
+Revision ID: b7e3f0a9c215
+Revises: 9e4b2d71c5a3
+Create Date: 2026-10-18 16:02:47.193520
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e3f0a9c215"
+down_revision: Union[str, Sequence[str], None] = "9e4b2d71c5a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The users live on the directory database, a shard's users table stays
+# empty and can't back the owner_id foreign keys
+FOREIGN_KEYS = (
+    ("tasks_owner_id_fkey", "tasks"),
+    ("task_tombstones_owner_id_fkey", "task_tombstones"),
+)
+# SQLite doesn't keep the name of a foreign key, batch mode names the
+# reflected ones the way Postgres does so they can be dropped by name
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def on_shard() -> bool:
+    # Set by alembic/env.py while it migrates the TASK_SHARD_URLS databases
+    return context.config.attributes.get("shard") is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not on_shard():
+        return
+    for name, table in FOREIGN_KEYS:
+        with op.batch_alter_table(
+            table, naming_convention=NAMING_CONVENTION
+        ) as batch_op:
+            batch_op.drop_constraint(name, type_="foreignkey")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not on_shard():
+        return
+    for name, table in FOREIGN_KEYS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_foreign_key(name, "users", ["owner_id"], ["id"])
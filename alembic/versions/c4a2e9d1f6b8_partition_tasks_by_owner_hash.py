@@ -0,0 +1,98 @@
+"""partition tasks by a hash of owner_id
+
+Revision ID: c4a2e9d1f6b8
+Revises: b7e3f0a9c215
+Create Date: 2026-10-18 17:40:12.508311
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a2e9d1f6b8"
+down_revision: Union[str, Sequence[str], None] = "b7e3f0a9c215"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every task query filters on owner_id, so Postgres only scans the one
+# partition holding the owner. Hot partitions can be split later with
+# python -m app.db.partitions split.
+PARTITIONS = 16
+
+TASK_INDEXES = (
+    "CREATE INDEX ix_tasks_owner_id_created_at_id "
+    "ON tasks (owner_id, created_at, id)",
+    "CREATE INDEX ix_tasks_owner_id_updated_at_id "
+    "ON tasks (owner_id, updated_at, id)",
+    "CREATE INDEX ix_tasks_title_trgm ON tasks USING gin (title gin_trgm_ops)",
+    "CREATE INDEX ix_tasks_description_trgm "
+    "ON tasks USING gin (description gin_trgm_ops)",
+)
+TASK_INDEX_NAMES = (
+    "ix_tasks_owner_id_created_at_id",
+    "ix_tasks_owner_id_updated_at_id",
+    "ix_tasks_title_trgm",
+    "ix_tasks_description_trgm",
+)
+
+
+def on_shard() -> bool:
+    # Set by alembic/env.py, shards have no owner foreign key (b7e3f0a9c215)
+    return context.config.attributes.get("shard") is not None
+
+
+def rebuild_tasks(partition_by: str | None) -> None:
+    """Move the rows of tasks into a new tasks table, partitioned or not."""
+    op.execute("ALTER TABLE tasks RENAME TO tasks_old")
+    op.execute("ALTER TABLE tasks_old RENAME CONSTRAINT tasks_pkey TO tasks_old_pkey")
+    for name in TASK_INDEX_NAMES:
+        op.execute(f"DROP INDEX {name}")
+
+    # LIKE keeps the column types, NOT NULLs and the id default on the
+    # tasks_id_seq sequence, which keeps ids unique across partitions
+    create = "CREATE TABLE tasks (LIKE tasks_old INCLUDING DEFAULTS)"
+    if partition_by is None:
+        op.execute(create)
+        op.execute("ALTER TABLE tasks ADD CONSTRAINT tasks_pkey PRIMARY KEY (id)")
+    else:
+        op.execute(f"{create} PARTITION BY {partition_by}")
+        for remainder in range(PARTITIONS):
+            op.execute(
+                f"CREATE TABLE tasks_p{remainder} PARTITION OF tasks "
+                f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+            )
+        # A partitioned table's primary key has to hold the partition key
+        op.execute(
+            "ALTER TABLE tasks ADD CONSTRAINT tasks_pkey PRIMARY KEY (id, owner_id)"
+        )
+    if not on_shard():
+        op.execute(
+            "ALTER TABLE tasks ADD CONSTRAINT tasks_owner_id_fkey "
+            "FOREIGN KEY (owner_id) REFERENCES users (id)"
+        )
+
+    # Indexes are built once the rows are in, cheaper than maintaining them
+    op.execute("INSERT INTO tasks SELECT * FROM tasks_old")
+    for statement in TASK_INDEXES:
+        op.execute(statement)
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id")
+    op.execute("DROP TABLE tasks_old")
+    op.execute("ANALYZE tasks")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Declarative partitioning is Postgres only, SQLite keeps a plain table
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    rebuild_tasks("HASH (owner_id)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # Partitions split since the upgrade are dropped along with the parent
+    rebuild_tasks(None)
@@ -0,0 +1,86 @@
+"""order task changes on a per-owner change sequence
+
+Revision ID: d5f1b3c7a9e2
+Revises: c4a2e9d1f6b8
+Create Date: 2026-10-18 20:24:51.730164
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5f1b3c7a9e2"
+down_revision: Union[str, Sequence[str], None] = "c4a2e9d1f6b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "task_change_counters",
+        sa.Column("owner_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("last_seq", sa.BigInteger(), nullable=False),
+        sa.Column("pruned_seq", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("owner_id"),
+    )
+    for table in ("tasks", "task_tombstones"):
+        op.add_column(
+            table,
+            sa.Column(
+                "change_seq", sa.BigInteger(), server_default="0", nullable=False
+            ),
+        )
+    # Existing rows: the deletes come first, a live task always wins over a
+    # tombstone of the same id. Old sync tokens are refused with a 410.
+    op.execute("UPDATE task_tombstones SET change_seq = 1")
+    op.execute("UPDATE tasks SET change_seq = 2")
+    op.execute(
+        "INSERT INTO task_change_counters (owner_id, last_seq, pruned_seq) "
+        "SELECT owner_id, 2, 0 FROM tasks "
+        "UNION SELECT owner_id, 2, 0 FROM task_tombstones"
+    )
+
+    op.create_index(
+        "ix_tasks_owner_id_change_seq_id",
+        "tasks",
+        ["owner_id", "change_seq", "id"],
+        unique=False,
+    )
+    op.drop_index(
+        "ix_task_tombstones_owner_id_deleted_at_id", table_name="task_tombstones"
+    )
+    op.create_index(
+        "ix_task_tombstones_owner_id_change_seq_id",
+        "task_tombstones",
+        ["owner_id", "change_seq", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_task_tombstones_deleted_at",
+        "task_tombstones",
+        ["deleted_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_task_tombstones_deleted_at", table_name="task_tombstones")
+    op.drop_index(
+        "ix_task_tombstones_owner_id_change_seq_id", table_name="task_tombstones"
+    )
+    op.create_index(
+        "ix_task_tombstones_owner_id_deleted_at_id",
+        "task_tombstones",
+        ["owner_id", "deleted_at", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_tasks_owner_id_change_seq_id", table_name="tasks")
+    for table in ("tasks", "task_tombstones"):
+        op.drop_column(table, "change_seq")
+    op.drop_table("task_change_counters")
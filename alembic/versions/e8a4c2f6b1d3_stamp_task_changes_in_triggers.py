@@ -0,0 +1,121 @@
+"""stamp task change sequences and tombstones in triggers
+
+Revision ID: e8a4c2f6b1d3
+Revises: d5f1b3c7a9e2
+Create Date: 2026-10-18 21:10:42.518306
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8a4c2f6b1d3"
+down_revision: Union[str, Sequence[str], None] = "d5f1b3c7a9e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copied from app/db/base.py so the migration doesn't change with the model
+TASK_CHANGE_SEQ_POSTGRESQL_DDL = (
+    "CREATE OR REPLACE FUNCTION next_task_change_seq(owner integer) "
+    "RETURNS bigint LANGUAGE sql AS $$ "
+    "INSERT INTO task_change_counters AS counter (owner_id, last_seq, pruned_seq) "
+    "VALUES (owner, 1, 0) ON CONFLICT (owner_id) "
+    "DO UPDATE SET last_seq = counter.last_seq + 1 RETURNING last_seq $$",
+    "CREATE OR REPLACE FUNCTION stamp_task_change_seq() "
+    "RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+    "IF TG_OP = 'INSERT' THEN "
+    "IF NEW.change_seq = 0 THEN "
+    "NEW.change_seq := next_task_change_seq(NEW.owner_id); END IF; "
+    "ELSIF (NEW.title, NEW.description, NEW.completed, NEW.updated_at) "
+    "IS DISTINCT FROM (OLD.title, OLD.description, OLD.completed, OLD.updated_at) "
+    "THEN NEW.change_seq := next_task_change_seq(NEW.owner_id); END IF; "
+    "RETURN NEW; END $$",
+    "CREATE OR REPLACE FUNCTION record_task_tombstone() "
+    "RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+    "INSERT INTO task_tombstones (task_id, owner_id, deleted_at, change_seq) "
+    "VALUES (OLD.id, OLD.owner_id, now(), next_task_change_seq(OLD.owner_id)); "
+    "RETURN NULL; END $$",
+    "CREATE TRIGGER tasks_change_seq BEFORE INSERT OR UPDATE ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION stamp_task_change_seq()",
+    "CREATE TRIGGER tasks_tombstone AFTER DELETE ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION record_task_tombstone()",
+)
+TASK_CHANGE_SEQ_SQLITE_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS tasks_change_seq_ai AFTER INSERT ON tasks "
+    "WHEN new.change_seq = 0 BEGIN "
+    "INSERT INTO task_change_counters (owner_id, last_seq, pruned_seq) "
+    "VALUES (new.owner_id, 1, 0) "
+    "ON CONFLICT (owner_id) DO UPDATE SET last_seq = last_seq + 1; "
+    "UPDATE tasks SET change_seq = (SELECT last_seq FROM task_change_counters "
+    "WHERE owner_id = new.owner_id) WHERE id = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_change_seq_au "
+    "AFTER UPDATE OF title, description, completed, updated_at ON tasks "
+    "WHEN new.title IS NOT old.title OR new.description IS NOT old.description "
+    "OR new.completed IS NOT old.completed OR new.updated_at IS NOT old.updated_at "
+    "BEGIN "
+    "INSERT INTO task_change_counters (owner_id, last_seq, pruned_seq) "
+    "VALUES (new.owner_id, 1, 0) "
+    "ON CONFLICT (owner_id) DO UPDATE SET last_seq = last_seq + 1; "
+    "UPDATE tasks SET change_seq = (SELECT last_seq FROM task_change_counters "
+    "WHERE owner_id = new.owner_id) WHERE id = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_change_seq_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO task_change_counters (owner_id, last_seq, pruned_seq) "
+    "VALUES (old.owner_id, 1, 0) "
+    "ON CONFLICT (owner_id) DO UPDATE SET last_seq = last_seq + 1; "
+    "INSERT INTO task_tombstones (task_id, owner_id, deleted_at, change_seq) "
+    "VALUES (old.id, old.owner_id, CURRENT_TIMESTAMP, "
+    "(SELECT last_seq FROM task_change_counters WHERE owner_id = old.owner_id)); "
+    "END",
+)
+# The change sequence triggers update rows before tasks_fts_ai has indexed
+# them, the search index only follows the indexed columns now
+TASKS_FTS_AU_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au "
+    "AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END"
+)
+OLD_TASKS_FTS_AU_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS tasks_fts_au")
+        op.execute(TASKS_FTS_AU_DDL)
+        for statement in TASK_CHANGE_SEQ_SQLITE_DDL:
+            op.execute(statement)
+        return
+
+    for statement in TASK_CHANGE_SEQ_POSTGRESQL_DDL:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in (
+            "tasks_change_seq_ai",
+            "tasks_change_seq_au",
+            "tasks_change_seq_ad",
+            "tasks_fts_au",
+        ):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute(OLD_TASKS_FTS_AU_DDL)
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS tasks_tombstone ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS tasks_change_seq ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS record_task_tombstone()")
+    op.execute("DROP FUNCTION IF EXISTS stamp_task_change_seq()")
+    op.execute("DROP FUNCTION IF EXISTS next_task_change_seq(integer)")
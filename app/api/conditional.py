@@ -0,0 +1,62 @@
+import hashlib
+from typing import Any
+
+from fastapi import HTTPException, Request, status
+
+
+class ConditionalRequest:
+    """Dependency answering conditional GETs with weak ETags.
+
+    The route derives a validator from whatever changes with its
+    representation (ids, updated_at, an aggregate...), typically with a
+    query much cheaper than building the response:
+
+        @router.get("/things")
+        async def get_things(conditional: ConditionalRequest = Depends()):
+            etag = conditional.check(count, last_modified)
+            ...
+            return json_response(adapter, things, headers=conditional.headers)
+
+    `check` raises a 304 when the client's If-None-Match already matches,
+    `check_etag` does the same for a tag computed earlier (e.g. cached).
+    """
+
+    def __init__(self, request: Request):
+        self.request = request
+        self.etag: str | None = None
+
+    def make_etag(self, *validators: Any) -> str:
+        # The URL is part of the tag, two pages of a list never share one
+        url = self.request.url
+        payload = repr((url.path, url.query, validators)).encode()
+        return f'W/"{hashlib.sha256(payload).hexdigest()[:32]}"'
+
+    def matches(self, etag: str) -> bool:
+        if_none_match = self.request.headers.get("if-none-match")
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison, the W/ prefix is ignored on both sides
+        candidates = {
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        }
+        return etag.removeprefix("W/") in candidates
+
+    def check(self, *validators: Any) -> str:
+        return self.check_etag(self.make_etag(*validators))
+
+    def check_etag(self, etag: str) -> str:
+        self.etag = etag
+        if self.matches(etag):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers
+            )
+        return etag
+
+    @property
+    def headers(self) -> dict[str, str]:
+        if self.etag is None:
+            return {}
+        # Responses are per user and must be revalidated before reuse
+        return {"ETag": self.etag, "Cache-Control": "private, no-cache"}
@@ -1,25 +1,134 @@
-from typing import Annotated
+import hmac
+from typing import Annotated, AsyncGenerator
 
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import CacheBackend, make_backend, per_worker_state_allowed
 from app.core.config import config
 from app.core.security import (
     credentials_exception,
+    get_current_principal,
     get_subject_for_token_type,
-    get_user,
 )
-from app.db.session import get_db
+from app.db.session import get_db, get_replica_db
+from app.db.shards import task_shards
+from app.schemas.user import CurrentUser
 
 oauth2scheme = OAuth2PasswordBearer(tokenUrl=f"{config.API_V1_PREFIX}/auth/login")
 
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class RecentWriters:
+    """Token subjects that sent a write in the last `window` seconds.
+
+    Their reads go to the primary until the replica has caught up, so they
+    always see their own writes. A write is recorded when its request
+    starts, the window has to cover the replication lag plus the time the
+    write takes to commit.
+
+    The next read may land on another worker. On a backend the workers
+    don't share, every read goes to the primary unless the app is a single
+    process.
+    """
+
+    def __init__(self, backend: CacheBackend, window: float):
+        self.backend = backend
+        self.window = window
+
+    @staticmethod
+    def _key(email: str) -> str:
+        return f"writer:{email}"
+
+    async def mark(self, email: str) -> None:
+        if self.window > 0:
+            await self.backend.set(self._key(email), True, ttl=self.window)
+
+    async def wrote_recently(self, email: str) -> bool:
+        if self.window <= 0:
+            return False
+        if not per_worker_state_allowed(self.backend):
+            return True
+        return await self.backend.get(self._key(email)) is not None
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+
+recent_writers = RecentWriters(
+    make_backend(
+        "writers",
+        maxsize=config.USER_CACHE_MAX_SIZE,
+        ttl=config.READ_YOUR_WRITES_SECONDS,
+    ),
+    window=config.READ_YOUR_WRITES_SECONDS,
+)
+
+
+async def get_read_db(
+    request: Request,
+    token: Annotated[str, Depends(oauth2scheme)],
+    primary: AsyncSession = Depends(get_db),
+    replica: AsyncSession = Depends(get_replica_db),
+) -> AsyncSession:
+    # Sessions only connect on their first statement, the one not picked
+    # costs nothing
+    email = get_subject_for_token_type(token, "access")
+    if request.method not in SAFE_METHODS:
+        # Writes share the request's primary session
+        await recent_writers.mark(email)
+        return primary
+    if await recent_writers.wrote_recently(email):
+        return primary
+    return replica
+
 
 async def get_current_user(
-    token: Annotated[str, Depends(oauth2scheme)], db: AsyncSession = Depends(get_db)
-):
+    token: Annotated[str, Depends(oauth2scheme)],
+    db: AsyncSession = Depends(get_read_db),
+) -> CurrentUser:
     email = get_subject_for_token_type(token, "access")
-    user = await get_user(email, db=db)
+    user = await get_current_principal(email, db=db)
     if user is None:
         raise credentials_exception("Could not find user for this token")
     return user
+
+
+async def get_task_db(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session on the shard holding the current user's tasks."""
+    if not task_shards.sharded:
+        yield db
+        return
+    async with task_shards.session(current_user.id) as session:
+        yield session
+
+
+async def get_task_read_db(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Like get_task_db for the read-only routes. Shards have no replicas,
+    reads go to the shard itself."""
+    if not task_shards.sharded:
+        yield db
+        return
+    async with task_shards.session(current_user.id) as session:
+        yield session
+
+
+async def require_internal_access(request: Request) -> None:
+    """Guards the operational routes (/internal/*, /metrics)."""
+    if not config.INTERNAL_ENDPOINTS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if config.INTERNAL_API_TOKEN is None:
+        return
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        token.encode(), config.INTERNAL_API_TOKEN.encode()
+    ):
+        raise credentials_exception("Invalid internal API token")
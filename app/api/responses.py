@@ -0,0 +1,25 @@
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def json_response(
+    adapter: TypeAdapter,
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    """Validate `content` (ORM objects, rows or models) against the response
+    schema and serialize it straight to JSON bytes with pydantic-core.
+
+    This skips the jsonable_encoder + json.dumps pass, the route keeps its
+    response_model for the OpenAPI schema.
+    """
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
@@ -4,17 +4,19 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import recent_writers
 from app.core.security import (
     create_access_token,
     credentials_exception,
     get_user,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
 )
 from app.db.base import User
+from app.db.query_budget import query_budget
 from app.db.session import get_db
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserOut
@@ -24,7 +26,12 @@ from app.schemas.user import UserCreate, UserOut
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/signup", status_code=201, response_model=UserOut)
+@router.post(
+    "/signup",
+    status_code=201,
+    response_model=UserOut,
+    dependencies=[Depends(query_budget(3))],
+)
 async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     if await get_user(email=user.email, db=db):
         raise HTTPException(
@@ -39,19 +46,30 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
                 detail="This phone number is already used!",
             )
 
-    hashed_password = hash_password(user.password)
-    new_user = User()
-    new_user.email = user.email
-    new_user.hashed_password = hashed_password
-    new_user.phone_number = user.phone_number
-    new_user.confirmed = False
-    db.add(new_user)
+    hashed_password = await hash_password_async(user.password)
+    query = (
+        insert(User)
+        .values(
+            email=user.email,
+            hashed_password=hashed_password,
+            phone_number=user.phone_number,
+            confirmed=False,
+        )
+        .returning(User)
+    )
+    new_user = await db.scalar(query)
     await db.commit()
-    await db.refresh(new_user)
+    # The replica may not have the row yet when the first token is used
+    await recent_writers.mark(new_user.email)
     return new_user
 
 
-@router.post("/login", status_code=200, response_model=Token)
+@router.post(
+    "/login",
+    status_code=200,
+    response_model=Token,
+    dependencies=[Depends(query_budget(1))],
+)
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: AsyncSession = Depends(get_db),
@@ -60,9 +78,12 @@ async def login(
     user = await get_user(email=form_data.username, db=db)
     if not user:
         raise credentials_exception("Invalid email or password")
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password_async(form_data.password, user.hashed_password):
         raise credentials_exception("Invalid email or password")
     # if not user.confirmed:
     #     raise credentials_exception("User has not confirmed email")
+    # A fresh signup may not be on the replica yet, the user's next
+    # requests read from the primary for a while
+    await recent_writers.mark(user.email)
     access_token = create_access_token(email=user.email)
     return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import require_internal_access
+from app.api.v1.endpoints.tasks import task_response_cache
+from app.core.security import password_hashing_pool, token_cache, user_cache
+from app.db.session import engine, pool_stats, read_engine
+from app.db.shards import task_shards
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(require_internal_access)],
+)
+
+
+@router.get("/cache-stats", status_code=200)
+async def get_cache_stats():
+    return {
+        "users": user_cache.stats(),
+        "tokens": token_cache.stats(),
+        "task_responses": task_response_cache.stats(),
+    }
+
+
+@router.get("/password-hashing", status_code=200)
+async def get_password_hashing_stats():
+    return password_hashing_pool.stats()
+
+
+@router.get("/db-pool", status_code=200)
+async def get_db_pool_stats():
+    # Every engine has its own pool: the primary, the replica when there is
+    # one and each task shard
+    engines = {"primary": engine}
+    if read_engine is not engine:
+        engines["replica"] = read_engine
+    for index, shard in enumerate(task_shards.engines):
+        engines[f"shard_{index}"] = shard
+    return {name: pool_stats(pool_engine.pool) for name, pool_engine in engines.items()}
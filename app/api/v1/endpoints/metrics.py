@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import require_internal_access
+from app.core.metrics import render_metrics
+
+router = APIRouter(tags=["internal"], dependencies=[Depends(require_internal_access)])
+
+
+@router.get("/metrics", status_code=200, response_class=PlainTextResponse)
+async def get_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,109 +1,702 @@
-from typing import Optional
+import codecs
+import csv
+import io
+import logging
+from datetime import datetime, timezone
+from itertools import islice
+from typing import IO, Annotated, AsyncIterator, Iterator, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Request,
+    UploadFile,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import case, delete, func, insert, literal, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user
-from app.db.base import Task, User
-from app.db.session import get_db
-from app.schemas.task import TaskCreate, TaskOut, TaskUpdate
+from app.api.conditional import ConditionalRequest
+from app.api.deps import get_current_user, get_task_db, get_task_read_db
+from app.api.responses import json_response
+from app.core.cache import ResponseCache, make_backend, response_weight
+from app.core.config import config
+from app.core.pagination import (
+    decode_cursor,
+    decode_sync_token,
+    encode_cursor,
+    encode_sync_token,
+    sync_token_expired_exception,
+)
+from app.db.base import Task, TaskChangeCounter, TaskTombstone
+from app.db.query_budget import query_budget
+from app.db.search import apply_task_search
+from app.schemas.task import (
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskChanges,
+    TaskCreate,
+    TaskImportError,
+    TaskImportResult,
+    TaskOut,
+    TaskStats,
+    TaskUpdate,
+    task_adapter,
+    task_bulk_results_adapter,
+    task_changes_adapter,
+    task_list_adapter,
+    task_stats_adapter,
+)
+from app.schemas.user import CurrentUser
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
-@router.post("/", response_model=TaskOut, status_code=201)
+# The columns TaskOut is built from. Tasks are selected (and returned) as
+# plain rows of these instead of Task entities, which skips the identity
+# map and attribute instrumentation on paths that never modify them.
+TASK_OUT_COLUMNS = tuple(getattr(Task, name) for name in TaskOut.model_fields)
+
+
+# GET responses of the list and detail routes. Every write below drops the
+# owner's entries by bumping its version, right after its commit.
+task_response_cache = ResponseCache(
+    make_backend(
+        "tasks",
+        maxsize=config.RESPONSE_CACHE_MAX_SIZE,
+        ttl=config.RESPONSE_CACHE_TTL_SECONDS,
+        weigh=response_weight,
+    ),
+    ttl=config.RESPONSE_CACHE_TTL_SECONDS,
+    namespace="tasks",
+)
+
+
+def bulk_body(**kwargs):
+    return Body(min_length=1, max_length=config.TASKS_BULK_MAX_ITEMS, **kwargs)
+
+
+@router.post(
+    "/",
+    response_model=TaskOut,
+    status_code=201,
+    dependencies=[Depends(query_budget(2))],
+)
 async def create_task(
     task: TaskCreate,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_task_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    new_task = Task()
-    new_task.description = task.description
-    new_task.title = task.title
-    new_task.owner_id = current_user.id
-    db.add(new_task)
+    # RETURNING hands back the defaults (id, timestamps...) with the insert
+    query = (
+        insert(Task)
+        .values(
+            title=task.title,
+            description=task.description,
+            owner_id=current_user.id,
+        )
+        .returning(*TASK_OUT_COLUMNS)
+    )
+    new_task = (await db.execute(query)).one()
     await db.commit()
-    await db.refresh(new_task)
-    return new_task
+    await task_response_cache.invalidate(current_user.id)
+    return json_response(task_adapter, new_task, status_code=201)
 
 
-@router.get("/", response_model=list[TaskOut], status_code=200)
+@router.get(
+    "/",
+    response_model=list[TaskOut],
+    status_code=200,
+    dependencies=[Depends(query_budget(3))],
+)
 async def get_user_tasks(
+    request: Request,
     skip: int = 0,
     limit: int = 10,
     search: Optional[str] = None,
     completed: Optional[bool] = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    conditional: ConditionalRequest = Depends(),
+    db: AsyncSession = Depends(get_task_read_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    query = select(Task).where(Task.owner_id == current_user.id)
+    if after is not None and before is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either 'after' or 'before', not both!",
+        )
+    cache_key = await task_response_cache.key(current_user.id, request)
+    cached = await task_response_cache.get(cache_key)
+    if cached is not None:
+        conditional.check_etag(cached.headers["etag"])
+        return cached
+    # Every write to the user's tasks moves one of these, so they make the
+    # ETag of any page. A poll that changed nothing ends here with a 304.
+    version = await db.execute(
+        select(func.count(), func.max(Task.updated_at), func.max(Task.id)).where(
+            Task.owner_id == current_user.id
+        )
+    )
+    total, last_updated_at, last_id = version.one()
+    conditional.check(current_user.id, total, last_updated_at, last_id)
+
+    query = select(*TASK_OUT_COLUMNS).where(Task.owner_id == current_user.id)
+    filtered = completed is not None or search is not None
     if completed is not None:
         query = query.where(Task.completed == completed)
+    relevance = None
     if search is not None:
-        query = query.where(Task.title.ilike(f"%{search}%"))
-    query = query.offset(skip).limit(limit)
+        query, relevance = apply_task_search(query, search, db.get_bind().dialect.name)
+    # X-Total-Count: unfiltered, it is the count the ETag query already
+    # made. Filtered, a window count rides along with the page, which only
+    # works while no cursor narrows the rows down.
+    count_in_page = filtered and after is None and before is None
+    if count_in_page:
+        query = query.add_columns(func.count().over().label("total_count"))
+    # Search results are ranked by relevance, except when the client is
+    # walking them with a cursor
+    ranked = relevance is not None and after is None and before is None
+
+    # Keyset pagination: rows are ordered on (created_at, id), which is
+    # covered by the (owner_id, created_at, id) index, so a cursor page
+    # costs the same as the first one. skip is kept for old clients.
+    position = tuple_(Task.created_at, Task.id)
+    if before is not None:
+        query = query.where(position < decode_cursor(before))
+        query = query.order_by(Task.created_at.desc(), Task.id.desc())
+    else:
+        if after is not None:
+            query = query.where(position > decode_cursor(after))
+        if ranked:
+            query = query.order_by(relevance)
+        query = query.order_by(Task.created_at, Task.id)
+    # One extra row tells us whether there is another page
+    query = query.offset(skip).limit(limit + 1)
+    result = await db.execute(query)
+    tasks = result.all()
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+    if before is not None:
+        tasks.reverse()
+
+    headers = conditional.headers
+    if count_in_page:
+        if tasks:
+            headers["X-Total-Count"] = str(tasks[0].total_count)
+        elif skip == 0:
+            headers["X-Total-Count"] = "0"
+    elif not filtered:
+        headers["X-Total-Count"] = str(total)
+    # Cursors only make sense when the page follows the keyset ordering
+    if tasks and not ranked:
+        first, last = tasks[0], tasks[-1]
+        if before is not None or has_more:
+            headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+        if after is not None or skip > 0 or (before is not None and has_more):
+            headers["X-Prev-Cursor"] = encode_cursor(first.created_at, first.id)
+    response = json_response(task_list_adapter, tasks, headers=headers)
+    await task_response_cache.set(cache_key, response)
+    return response
+
+
+@router.get(
+    "/changes",
+    response_model=TaskChanges,
+    status_code=200,
+    dependencies=[Depends(query_budget(4))],
+)
+async def get_task_changes(
+    since: Optional[str] = None,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_task_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    # Tasks created or updated and tasks deleted (tombstones) are walked
+    # together, ordered on (change_seq, deleted, id). Sequence numbers are
+    # handed out in commit order (app/db/base.py), a change can't land
+    # behind a token already given out. Both sides are served by their
+    # (owner_id, change_seq, id) index.
+    tasks_query = select(*TASK_OUT_COLUMNS, Task.change_seq).where(
+        Task.owner_id == current_user.id
+    )
+    tombstones_query = select(
+        TaskTombstone.id, TaskTombstone.task_id, TaskTombstone.change_seq
+    ).where(TaskTombstone.owner_id == current_user.id)
+    if since is not None:
+        change_seq, deleted, row_id = decode_sync_token(since)
+        # Deletes from before the token may have been pruned since
+        pruned_seq = await db.scalar(
+            select(TaskChangeCounter.pruned_seq).where(
+                TaskChangeCounter.owner_id == current_user.id
+            )
+        )
+        if pruned_seq is not None and change_seq < pruned_seq:
+            raise sync_token_expired_exception()
+        if deleted:
+            tasks_query = tasks_query.where(Task.change_seq > change_seq)
+            tombstones_query = tombstones_query.where(
+                tuple_(TaskTombstone.change_seq, TaskTombstone.id)
+                > (change_seq, row_id)
+            )
+        else:
+            tasks_query = tasks_query.where(
+                tuple_(Task.change_seq, Task.id) > (change_seq, row_id)
+            )
+            tombstones_query = tombstones_query.where(
+                TaskTombstone.change_seq >= change_seq
+            )
+    tasks = await db.execute(
+        tasks_query.order_by(Task.change_seq, Task.id).limit(limit + 1)
+    )
+    tombstones = await db.execute(
+        tombstones_query.order_by(TaskTombstone.change_seq, TaskTombstone.id).limit(
+            limit + 1
+        )
+    )
+    events = sorted(
+        [(task.change_seq, False, task.id, task) for task in tasks]
+        + [(t.change_seq, True, t.id, t.task_id) for t in tombstones],
+        key=lambda event: event[:3],
+    )
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    # Only the latest event of a task counts (SQLite may reuse the id of a
+    # deleted task)
+    latest = {}
+    for event in events:
+        task_id = event[3] if event[1] else event[2]
+        latest.pop(task_id, None)
+        latest[task_id] = event
+    changes = {
+        "changed": [event[3] for event in latest.values() if not event[1]],
+        "deleted": [event[3] for event in latest.values() if event[1]],
+        "sync_token": encode_sync_token(*events[-1][:3]) if events else since,
+        "has_more": has_more,
+    }
+    return json_response(task_changes_adapter, changes)
+
+
+@router.get(
+    "/stats",
+    response_model=TaskStats,
+    status_code=200,
+    dependencies=[Depends(query_budget(2))],
+)
+async def get_task_stats(
+    by_day: bool = False,
+    db: AsyncSession = Depends(get_task_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    # A single GROUP BY, only the counts leave the database. Days are
+    # those of the database session time zone.
+    groups = [Task.completed]
+    if by_day:
+        groups.insert(0, func.date(Task.created_at).label("day"))
+    query = (
+        select(*groups, func.count().label("count"))
+        .where(Task.owner_id == current_user.id)
+        .group_by(*groups)
+        .order_by(*groups)
+    )
+    result = await db.execute(query)
+
+    stats = {"total": 0, "completed": 0, "open": 0}
+    days = {}
+    for row in result:
+        stats["total"] += row.count
+        stats["completed" if row.completed else "open"] += row.count
+        if by_day:
+            day = days.setdefault(row.day, {"day": row.day, "total": 0, "completed": 0})
+            day["total"] += row.count
+            if row.completed:
+                day["completed"] += row.count
+    if by_day:
+        stats["by_day"] = list(days.values())
+    return json_response(task_stats_adapter, stats)
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get(
+    "/export",
+    status_code=200,
+    response_class=StreamingResponse,
+    dependencies=[Depends(query_budget(2))],
+)
+async def export_tasks(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: AsyncSession = Depends(get_task_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    query = (
+        select(*TASK_OUT_COLUMNS)
+        .where(Task.owner_id == current_user.id)
+        .order_by(Task.created_at, Task.id)
+        .execution_options(yield_per=config.TASKS_EXPORT_BATCH_SIZE)
+    )
+    # stream() uses a server-side cursor, only one batch of rows is held in
+    # memory at any time whatever the size of the account
+    result = await db.stream(query)
+    encode = encode_csv if format == "csv" else encode_ndjson
+    return StreamingResponse(
+        encode(result.partitions()),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+
+def export_task(row) -> TaskOut:
+    return task_adapter.validate_python(row, from_attributes=True)
+
+
+async def encode_ndjson(partitions: AsyncIterator) -> AsyncIterator[bytes]:
+    async for partition in partitions:
+        yield b"".join(
+            task_adapter.dump_json(export_task(task)) + b"\n" for task in partition
+        )
+
+
+async def encode_csv(partitions: AsyncIterator) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(TaskOut.model_fields))
+    writer.writeheader()
+    async for partition in partitions:
+        writer.writerows(
+            task_adapter.dump_python(export_task(task), mode="json")
+            for task in partition
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Only the header is left when there are no tasks
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.post(
+    "/import",
+    response_model=TaskImportResult,
+    status_code=200,
+    dependencies=[Depends(query_budget(allow_repeats=True))],
+)
+async def import_tasks(
+    file: UploadFile,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    db: AsyncSession = Depends(get_task_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    if format is None:
+        is_csv = (file.filename or "").lower().endswith(".csv")
+        format = "csv" if is_csv else "ndjson"
+    # The upload is read line by line, a chunk at a time, so a large file
+    # is never loaded in memory as a whole
+    rows = read_csv_rows(file.file) if format == "csv" else read_ndjson_rows(file.file)
+
+    result = TaskImportResult()
+    while True:
+        try:
+            chunk = await run_in_threadpool(
+                lambda: list(islice(rows, config.TASKS_IMPORT_CHUNK_SIZE))
+            )
+        except (UnicodeDecodeError, csv.Error) as e:
+            # The chunks before stay imported, the client is told how far
+            # the import went
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail={
+                    "message": f"Could not read the file: {e}",
+                    **result.model_dump(),
+                },
+            ) from e
+        if not chunk:
+            break
+
+        new_tasks = []
+        for line, data in chunk:
+            try:
+                if isinstance(data, str):
+                    task = TaskCreate.model_validate_json(data)
+                else:
+                    task = TaskCreate.model_validate(data)
+            except ValidationError as e:
+                result.failed += 1
+                if len(result.errors) < config.TASKS_IMPORT_MAX_ERRORS:
+                    result.errors.append(
+                        TaskImportError(
+                            line=line,
+                            errors=[error["msg"] for error in e.errors()],
+                        )
+                    )
+                continue
+            new_tasks.append(
+                {
+                    "title": task.title,
+                    "description": task.description,
+                    "owner_id": current_user.id,
+                }
+            )
+        if new_tasks:
+            # Multi-row INSERT batches, committed chunk by chunk
+            await db.execute(insert(Task), new_tasks)
+            await db.commit()
+            await task_response_cache.invalidate(current_user.id)
+            result.imported += len(new_tasks)
+        logger.info(
+            "Importing tasks",
+            extra={
+                "owner_id": current_user.id,
+                "imported": result.imported,
+                "failed": result.failed,
+            },
+        )
+    return result
+
+
+def read_ndjson_rows(file: IO[bytes]) -> Iterator[tuple[int, str]]:
+    for line_number, line in enumerate(codecs.iterdecode(file, "utf-8"), start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def read_csv_rows(file: IO[bytes]) -> Iterator[tuple[int, dict]]:
+    reader = csv.DictReader(codecs.iterdecode(file, "utf-8-sig"))
+    for row in reader:
+        # Empty cells are missing values rather than empty strings
+        yield reader.line_num, {
+            key: value for key, value in row.items() if key and value != ""
+        }
+
+
+# The bulk routes are declared before /{task_id} so "bulk" isn't taken
+# for a task id. Each one is a single statement in a single transaction.
+@router.post(
+    "/bulk",
+    response_model=list[TaskOut],
+    status_code=201,
+    dependencies=[Depends(query_budget(2))],
+)
+async def create_tasks_bulk(
+    tasks: Annotated[list[TaskCreate], bulk_body()],
+    db: AsyncSession = Depends(get_task_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    rows = [
+        {
+            "title": task.title,
+            "description": task.description,
+            "owner_id": current_user.id,
+        }
+        for task in tasks
+    ]
+    # Sent as multi-row INSERT ... VALUES ... RETURNING batches. RETURNING
+    # doesn't promise any order, but ids are handed out in VALUES order so
+    # sorting on them gives back the order of the request. Asking SQLAlchemy
+    # for sort_by_parameter_order instead would send one INSERT per row on
+    # SQLite, which has no sentinel for ordered batches.
+    query = insert(Task).returning(*TASK_OUT_COLUMNS)
+    result = await db.execute(query, rows)
+    new_tasks = sorted(result.all(), key=lambda task: task.id)
+    await db.commit()
+    await task_response_cache.invalidate(current_user.id)
+    return json_response(task_list_adapter, new_tasks, status_code=201)
+
+
+@router.patch(
+    "/bulk",
+    response_model=list[TaskBulkResult],
+    status_code=200,
+    dependencies=[Depends(query_budget(2))],
+)
+async def update_tasks_bulk(
+    updated_tasks: Annotated[list[TaskBulkUpdate], bulk_body()],
+    db: AsyncSession = Depends(get_task_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    ids = [task.id for task in updated_tasks]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Each task can only appear once in a bulk update!",
+        )
+
+    # Every task sets its own columns, so each column gets a
+    # CASE id WHEN ... THEN ... ELSE <current value> END
+    values = {}
+    changed_ids = []
+    for task in updated_tasks:
+        update_data = task.model_dump(exclude_unset=True, exclude={"id"})
+        if update_data:
+            changed_ids.append(task.id)
+        for key, value in update_data.items():
+            values.setdefault(key, {})[task.id] = value
+    columns = Task.__table__.c
+    query_values = {
+        key: case(
+            {
+                task_id: literal(value, columns[key].type)
+                for task_id, value in whens.items()
+            },
+            value=Task.id,
+            else_=getattr(Task, key),
+        )
+        for key, whens in values.items()
+    }
+    query_values["updated_at"] = case(
+        (Task.id.in_(changed_ids), datetime.now(timezone.utc)),
+        else_=Task.updated_at,
+    )
+    query = (
+        update(Task)
+        .where((Task.owner_id == current_user.id) & (Task.id.in_(ids)))
+        .values(query_values)
+        .returning(*TASK_OUT_COLUMNS)
+    )
+    result = await db.execute(query)
+    found = {task.id: task for task in result.all()}
+    await db.commit()
+    await task_response_cache.invalidate(current_user.id)
+    results = [
+        (
+            TaskBulkResult(id=task_id, status="updated", task=found[task_id])
+            if task_id in found
+            else TaskBulkResult(id=task_id, status="not_found")
+        )
+        for task_id in ids
+    ]
+    return json_response(task_bulk_results_adapter, results)
+
+
+@router.delete(
+    "/bulk",
+    response_model=list[TaskBulkResult],
+    status_code=200,
+    dependencies=[Depends(query_budget(2))],
+)
+async def delete_tasks_bulk(
+    ids: Annotated[list[int], bulk_body(embed=True)],
+    db: AsyncSession = Depends(get_task_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    # Syncing clients learn about the deletes from the tombstones, written
+    # by a trigger (app/db/base.py)
+    query = (
+        delete(Task)
+        .where((Task.owner_id == current_user.id) & (Task.id.in_(ids)))
+        .returning(Task.id)
+    )
     result = await db.scalars(query)
-    return result.all()
+    deleted = set(result.all())
+    await db.commit()
+    await task_response_cache.invalidate(current_user.id)
+    results = [
+        TaskBulkResult(
+            id=task_id, status="deleted" if task_id in deleted else "not_found"
+        )
+        for task_id in ids
+    ]
+    return json_response(task_bulk_results_adapter, results)
 
 
-@router.patch("/{task_id}", response_model=TaskOut, status_code=200)
+@router.patch(
+    "/{task_id}",
+    response_model=TaskOut,
+    status_code=200,
+    dependencies=[Depends(query_budget(2))],
+)
 async def update_task(
     task_id: int,
     updated_task: TaskUpdate,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_task_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    query = select(Task).where(
-        (Task.owner_id == current_user.id) & (Task.id == task_id)
-    )
-    result = await db.scalar(query)
-    if not result:
+    owned_task = (Task.owner_id == current_user.id) & (Task.id == task_id)
+    update_data = updated_task.model_dump(exclude_unset=True)
+    if update_data:
+        # One statement does the ownership check, the write and reads back
+        # the row. updated_at is set here, the ORM onupdate hook only runs
+        # on flushes.
+        query = (
+            update(Task)
+            .where(owned_task)
+            .values(**update_data, updated_at=datetime.now(timezone.utc))
+            .returning(*TASK_OUT_COLUMNS)
+        )
+    else:
+        # Nothing to change, the task is returned as it is
+        query = select(*TASK_OUT_COLUMNS).where(owned_task)
+    result = (await db.execute(query)).one_or_none()
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No task is found with this id!",
         )
-    update_data = updated_task.model_dump(exclude_unset=True)
-    for updated_data_key, updated_data_value in update_data.items():
-        setattr(result, updated_data_key, updated_data_value)
-
     await db.commit()
-    await db.refresh(result)
-    return result
+    await task_response_cache.invalidate(current_user.id)
+    return json_response(task_adapter, result)
 
 
-@router.get("/{task_id}", response_model=TaskOut, status_code=200)
+@router.get(
+    "/{task_id}",
+    response_model=TaskOut,
+    status_code=200,
+    dependencies=[Depends(query_budget(2))],
+)
 async def search_for_task(
     task_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    conditional: ConditionalRequest = Depends(),
+    db: AsyncSession = Depends(get_task_read_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    query = select(Task).where(
+    cache_key = await task_response_cache.key(current_user.id, request)
+    cached = await task_response_cache.get(cache_key)
+    if cached is not None:
+        conditional.check_etag(cached.headers["etag"])
+        return cached
+    query = select(*TASK_OUT_COLUMNS).where(
         (Task.owner_id == current_user.id) & (Task.id == task_id)
     )
-    result = await db.scalar(query)
-    if not result:
+    result = (await db.execute(query)).one_or_none()
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No task is found with this id!",
         )
-    return result
+    conditional.check(result.id, result.updated_at)
+    response = json_response(task_adapter, result, headers=conditional.headers)
+    await task_response_cache.set(cache_key, response)
+    return response
 
 
-@router.delete("/{task_id}", status_code=204)
+@router.delete("/{task_id}", status_code=204, dependencies=[Depends(query_budget(2))])
 async def delete_task(
     task_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_task_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    query = select(Task).where(
-        (Task.owner_id == current_user.id) & (Task.id == task_id)
+    # The ownership check and the delete are the same statement. Syncing
+    # clients learn about the delete from the tombstone, written by a
+    # trigger (app/db/base.py).
+    query = (
+        delete(Task)
+        .where((Task.owner_id == current_user.id) & (Task.id == task_id))
+        .returning(Task.id)
     )
     result = await db.scalar(query)
-    if not result:
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No task is found with this id!",
         )
-    await db.delete(result)
     await db.commit()
+    await task_response_cache.invalidate(current_user.id)
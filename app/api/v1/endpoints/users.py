@@ -4,14 +4,15 @@
 from fastapi import APIRouter, Depends
 
 from app.api.deps import get_current_user
-from app.db.base import User
-from app.schemas.user import UserOut
+from app.api.responses import json_response
+from app.db.query_budget import query_budget
+from app.schemas.user import CurrentUser, UserOut, user_adapter
 
 # logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-@router.get("/me", response_model=UserOut)
-async def get_me(current_user: User = Depends(get_current_user)):
-    return current_user
+@router.get("/me", response_model=UserOut, dependencies=[Depends(query_budget(1))])
+async def get_me(current_user: CurrentUser = Depends(get_current_user)):
+    return json_response(user_adapter, current_user)
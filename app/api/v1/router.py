@@ -7,6 +7,8 @@ from app.api.v1.endpoints.db_ping import router as db_router
 
 # Regestring endpoints
 from app.api.v1.endpoints.health import router as health_router
+from app.api.v1.endpoints.internal import router as internal_router
+from app.api.v1.endpoints.metrics import router as metrics_router
 from app.api.v1.endpoints.tasks import router as task_router
 from app.api.v1.endpoints.users import router as user_router
 
@@ -17,6 +19,8 @@ api_router = APIRouter()
 
 api_router.include_router(health_router)
 api_router.include_router(db_router)
+api_router.include_router(internal_router)
+api_router.include_router(metrics_router)
 api_router.include_router(auth_router)
 api_router.include_router(user_router)
 api_router.include_router(task_router)
@@ -0,0 +1,309 @@
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Protocol
+
+from fastapi import Request, Response
+from redis.asyncio import Redis
+
+from app.core.config import config
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after a TTL.
+
+    `weigh` optionally sizes the values (e.g. in bytes), the total weight
+    of the cached values is then reported by stats().
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.weigh = weigh
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self.delete(key)
+        self._data[key] = (time.monotonic() + ttl, value)
+        if self.weigh is not None:
+            self.weight += self.weigh(value)
+        while len(self._data) > self.maxsize:
+            # Evict the least recently used entry
+            self.delete(next(iter(self._data)))
+
+    def delete(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None and self.weigh is not None:
+            self.weight -= self.weigh(entry[1])
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+        if self.weigh is not None:
+            stats["weight"] = self.weight
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend(Protocol):
+    """Storage used by the application caches.
+
+    The default is in-process, RedisBackend is shared by every worker.
+    Values are JSON compatible.
+    """
+
+    # Whether every worker sees the same entries
+    shared: bool
+
+    async def get(self, key: str) -> Any: ...
+
+    async def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+class InMemoryBackend:
+    shared = False
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, weigh=weigh)
+
+    async def get(self, key: str) -> Any:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class RedisBackend:
+    """Entries kept in Redis as JSON, under `prefix` so that clear() only
+    drops the keys of its own cache."""
+
+    shared = True
+
+    def __init__(self, redis: Redis, prefix: str):
+        self._redis = redis
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Any:
+        value = await self._redis.get(self.prefix + key)
+        return None if value is None else json.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        await self._redis.set(
+            self.prefix + key, json.dumps(value), px=max(1, int(ttl * 1000))
+        )
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self.prefix + key)
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._redis.scan_iter(match=self.prefix + "*")]
+        if keys:
+            await self._redis.delete(*keys)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+# Backends to close when the app shuts down
+_redis_backends: list[RedisBackend] = []
+
+
+def make_backend(
+    name: str,
+    maxsize: int,
+    ttl: float,
+    weigh: Optional[Callable[[Any], int]] = None,
+) -> CacheBackend:
+    """Redis when CACHE_REDIS_URL is set, in-process otherwise."""
+    if config.CACHE_REDIS_URL:
+        backend = RedisBackend(
+            Redis.from_url(config.CACHE_REDIS_URL),
+            prefix=f"{config.APP_NAME}:{name}:",
+        )
+        _redis_backends.append(backend)
+        return backend
+    return InMemoryBackend(maxsize=maxsize, ttl=ttl, weigh=weigh)
+
+
+def per_worker_state_allowed(backend: CacheBackend) -> bool:
+    """Whether a cache whose entries must be seen by every worker (e.g.
+    invalidations) can run on `backend`."""
+    return backend.shared or config.CACHE_ALLOW_IN_PROCESS
+
+
+async def close_backends() -> None:
+    for backend in _redis_backends:
+        await backend.close()
+
+
+def response_weight(entry: Any) -> int:
+    # Approximate memory of a cached response, its body dominates
+    if isinstance(entry, dict) and "body" in entry:
+        return len(entry["body"])
+    return 0
+
+
+class ResponseCache:
+    """Per-owner cache of serialized GET responses.
+
+    Entries are keyed on the owner, the owner's current version and the
+    request URL. A write doesn't hunt down the owner's entries, it moves
+    the owner to a new random version: every entry cached before becomes
+    unreachable and ages out of the backend. Versions live in the backend
+    too, so with a shared backend every worker sees the bump. Version
+    tokens are random rather than incremented, concurrent bumps never need
+    a read-modify-write.
+
+    A response computed from data read before a write can only be stored
+    under the version that write replaced, so it is never served.
+
+    Versions are kept for a day, well past the responses cached under
+    them. Otherwise a version could expire first and orphan responses that
+    are still fresh. They still expire so that the versions of idle owners
+    don't pile up in Redis.
+
+    Version bumps have to reach every worker, the cache stays off on an
+    in-process backend unless the app is a single process.
+    """
+
+    VERSION_TTL_SECONDS = 24 * 3600
+
+    def __init__(self, backend: CacheBackend, ttl: float, namespace: str):
+        self.backend = backend
+        self.ttl = ttl
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+
+    def _version_key(self, owner_id: int) -> str:
+        return f"{self.namespace}:{owner_id}:version"
+
+    async def key(self, owner_id: int, request: Request) -> str:
+        if not self.enabled:
+            return ""
+        version = await self.backend.get(self._version_key(owner_id))
+        if version is None:
+            version = await self.invalidate(owner_id)
+        query = "&".join(sorted(request.url.query.split("&")))
+        return f"{self.namespace}:{owner_id}:{version}:{request.url.path}?{query}"
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and per_worker_state_allowed(self.backend)
+
+    async def get(self, key: str) -> Response | None:
+        if not self.enabled:
+            return None
+        entry = await self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return Response(
+            content=entry["body"].encode(),
+            status_code=entry["status_code"],
+            headers=entry["headers"],
+        )
+
+    async def set(self, key: str, response: Response) -> None:
+        if not self.enabled:
+            return
+        entry = {
+            "body": response.body.decode(),
+            "status_code": response.status_code,
+            "headers": {
+                name: value
+                for name, value in response.headers.items()
+                if name != "content-length"
+            },
+        }
+        await self.backend.set(key, entry, ttl=self.ttl)
+
+    async def invalidate(self, owner_id: int) -> str:
+        if not self.enabled:
+            return ""
+        version = uuid.uuid4().hex
+        await self.backend.set(
+            self._version_key(owner_id),
+            version,
+            ttl=max(self.ttl, self.VERSION_TTL_SECONDS),
+        )
+        return version
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+        backend_stats = getattr(self.backend, "stats", None)
+        if backend_stats is not None:
+            # Memory used by the in-process backend
+            backend = backend_stats()
+            stats["entries"] = backend["size"]
+            stats["bytes"] = backend.get("weight")
+        return stats
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,27 +8,92 @@ class BaseConfig(BaseSettings):
     ENV_STATE: str = "dev"
     APP_NAME: str = "todo-api"
     API_V1_PREFIX: str = "/api/v1"
+    LOG_LEVEL: str = "INFO"
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
 class GlobalConfig(BaseConfig):
     # Defaults
     DATABASE_URL: Optional[str] = None
+    # Streaming replica serving the read-only routes, the primary if unset.
+    # A user who just wrote reads from the primary for READ_YOUR_WRITES_SECONDS.
+    READ_DATABASE_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: int = 10
+    # Databases the tasks are sharded over by owner (app/db/shards.py), a
+    # JSON list in the environment. Empty keeps them on DATABASE_URL.
+    TASK_SHARD_URLS: list[str] = []
     DB_FORCE_ROLL_BACK: bool = False
+    # Raw SQLAlchemy echo, very verbose, only meant for local debugging
+    DB_ECHO: bool = False
+    # Query log: statements slower than the threshold are always logged,
+    # the others are sampled at SQL_LOG_SAMPLE_RATE (0 to 1)
+    SQL_SLOW_QUERY_MS: float = 200
+    SQL_LOG_SAMPLE_RATE: float = 0.0
+    # Per-request query budgets and N+1 detection: "off", "warn" (log) or
+    # "raise". A statement repeated SQL_N_PLUS_ONE_THRESHOLD times in one
+    # request is flagged.
+    SQL_QUERY_BUDGET_MODE: Literal["off", "warn", "raise"] = "off"
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    # Connection pool of the async engine
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    # /internal/* and /metrics expose cache, pool and traffic figures. They
+    # answer 404 unless enabled, and require INTERNAL_API_TOKEN as a bearer
+    # token when it is set.
+    INTERNAL_ENDPOINTS_ENABLED: bool = False
+    INTERNAL_API_TOKEN: Optional[str] = None
     SECRET_KEY: str = "please_change_this_to_a_real_secret_key_in_production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Most tasks a single bulk request may carry
+    TASKS_BULK_MAX_ITEMS: int = 500
+    # Rows fetched per round trip while streaming an export
+    TASKS_EXPORT_BATCH_SIZE: int = 1000
+    # Rows validated and inserted together while importing tasks
+    TASKS_IMPORT_CHUNK_SIZE: int = 1000
+    TASKS_IMPORT_MAX_ERRORS: int = 100
+    # Deleted tasks are reported to syncing clients for this long, older
+    # sync tokens get a 410 asking for a full sync (python -m app.db.sync)
+    TASK_TOMBSTONE_RETENTION_DAYS: int = 30
+    # Threads running bcrypt outside of the event loop
+    PASSWORD_HASHING_WORKERS: int = 4
+    # Authenticated user cache, a TTL of 0 disables it
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
+    # Verified JWT cache, entries expire with their token
+    TOKEN_CACHE_MAX_SIZE: int = 10_000
+    # Redis shared by every worker for the caches. Without it each worker
+    # has its own, which can't see the writes of the others: the user and
+    # response caches and read-your-writes then only run when
+    # CACHE_ALLOW_IN_PROCESS says the app is a single process.
+    CACHE_REDIS_URL: Optional[str] = None
+    CACHE_ALLOW_IN_PROCESS: bool = False
+    # GET /tasks responses cached per owner, a TTL of 0 disables it
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_MAX_SIZE: int = 10_000
 
 
 class DevConfig(GlobalConfig):
+    # uvicorn --reload runs a single worker
+    CACHE_ALLOW_IN_PROCESS: bool = True
+    INTERNAL_ENDPOINTS_ENABLED: bool = True
+    SQL_QUERY_BUDGET_MODE: Literal["off", "warn", "raise"] = "warn"
     model_config = SettingsConfigDict(env_prefix="DEV_")
 
 
 class ProdConfig(GlobalConfig):
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10
+    DB_POOL_PRE_PING: bool = True
     model_config = SettingsConfigDict(env_prefix="PROD_")
 
 
 class TestConfig(GlobalConfig):
+    SQL_QUERY_BUDGET_MODE: Literal["off", "warn", "raise"] = "raise"
     DATABASE_URL: str = "sqlite:///test.db"
     DB_FORCE_ROLL_BACK: bool = True
     model_config = SettingsConfigDict(env_prefix="TEST_")
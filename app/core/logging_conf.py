@@ -0,0 +1,41 @@
+from logging.config import dictConfig
+
+from app.core.config import config
+
+
+def configure_logging() -> None:
+    dictConfig(
+        {
+            "version": 1,
+            "disable_existing_loggers": False,
+            "filters": {
+                # Adds the X-Request-ID of the current request to every record
+                "correlation_id": {
+                    "()": "asgi_correlation_id.CorrelationIdFilter",
+                    "uuid_length": 32,
+                    "default_value": "-",
+                },
+            },
+            "formatters": {
+                "json": {
+                    "()": "pythonjsonlogger.json.JsonFormatter",
+                    "fmt": "%(asctime)s %(levelname)s %(name)s "
+                    "%(correlation_id)s %(message)s",
+                },
+            },
+            "handlers": {
+                "default": {
+                    "class": "logging.StreamHandler",
+                    "formatter": "json",
+                    "filters": ["correlation_id"],
+                },
+            },
+            "loggers": {
+                "app": {
+                    "handlers": ["default"],
+                    "level": config.LOG_LEVEL,
+                    "propagate": False,
+                },
+            },
+        }
+    )
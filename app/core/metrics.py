@@ -0,0 +1,202 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latency buckets in seconds, roughly what Prometheus clients default to
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Cumulative histogram per label set, rendered in the Prometheus text
+    exposition format."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (count per bucket, +Inf included, [sum])
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        # bcrypt timings are observed from worker threads
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            counts, total = self._series.setdefault(
+                labels, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def snapshot(self) -> dict[tuple[str, ...], tuple[int, float]]:
+        """(count, sum) of the observations of every label set."""
+        with self._lock:
+            return {
+                labels: (sum(counts), total[0])
+                for labels, (counts, total) in self._series.items()
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = [
+                (labels, list(counts), total[0])
+                for labels, (counts, total) in sorted(self._series.items())
+            ]
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _format_number(bound)
+                lines.append(
+                    f"{self.name}_bucket{self._labels(labels, le=le)} {cumulative}"
+                )
+            lines.append(
+                f"{self.name}_sum{self._labels(labels)} {_format_number(total)}"
+            )
+            lines.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return lines
+
+    def _labels(self, values: tuple[str, ...], **extra: str) -> str:
+        pairs = [*zip(self.labelnames, values), *extra.items()]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time spent answering HTTP requests.",
+    labelnames=("method", "route", "status"),
+)
+request_db_statements = Histogram(
+    "http_request_db_statements",
+    "SQL statements sent per HTTP request.",
+    labelnames=("method", "route"),
+    buckets=COUNT_BUCKETS,
+)
+request_db_duration = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL statements per HTTP request.",
+    labelnames=("method", "route"),
+)
+password_hashing_duration = Histogram(
+    "password_hashing_duration_seconds",
+    "Time spent in bcrypt, outside of the time waiting for a worker.",
+    labelnames=("operation",),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 5),
+)
+
+REGISTRY = (
+    request_duration,
+    request_db_statements,
+    request_db_duration,
+    password_hashing_duration,
+)
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+@dataclass
+class RequestStats:
+    db_statements: int = 0
+    db_duration: float = 0.0
+    # Query budget of the route (app/db/query_budget.py)
+    route: str = ""
+    query_budget: Optional[int] = None
+    allow_repeated_queries: bool = False
+    queries: Counter[str] = field(default_factory=Counter)
+
+
+# Stats of the request being served, filled in by the engine events
+current_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "current_request_stats", default=None
+)
+
+
+def record_db_statement(duration: float) -> Optional[RequestStats]:
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.db_statements += 1
+        stats.db_duration += duration
+    return stats
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that served the request, e.g.
+    /api/v1/tasks/{task_id}."""
+    # The router leaves the matched route in the scope. Depending on the
+    # FastAPI version its path may leave out the prefixes of the routers it
+    # was included through, they are taken back from the request path.
+    route_path = getattr(scope.get("route"), "path", None)
+    if route_path is None:
+        return "unmatched"
+    depth = route_path.count("/")
+    prefix = scope["path"].split("/")[: -depth or None]
+    return "/".join(prefix) + route_path
+
+
+class MetricsMiddleware:
+    """Records the latency, SQL statement count and SQL time of every HTTP
+    request, per route template (not per raw path, to bound cardinality)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            current_request_stats.reset(token)
+            route = route_template(scope)
+            method = scope["method"]
+            request_duration.observe(duration, method, route, str(status_code))
+            request_db_statements.observe(stats.db_statements, method, route)
+            request_db_duration.observe(stats.db_duration, method, route)
@@ -0,0 +1,71 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: datetime, task_id: int) -> str:
+    # The cursor is opaque for clients, it only carries the position
+    # of a row in the (created_at, id) ordering
+    return _encode([created_at.isoformat(), task_id])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, task_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise invalid_cursor_exception() from e
+
+
+def encode_sync_token(change_seq: int, deleted: bool, row_id: int) -> str:
+    # Position of the last change a client has seen, changes are ordered on
+    # (change_seq, deleted, row id) across tasks and tombstones
+    return _encode([change_seq, int(deleted), row_id])
+
+
+def decode_sync_token(token: str) -> tuple[int, bool, int]:
+    try:
+        change_seq, deleted, row_id = _decode(token)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise invalid_sync_token_exception() from e
+    if isinstance(change_seq, str):
+        # Tokens from when changes were ordered on their timestamp
+        raise sync_token_expired_exception()
+    try:
+        return int(change_seq), bool(deleted), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise invalid_sync_token_exception() from e
+
+
+def invalid_sync_token_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid sync token!",
+    )
+
+
+def sync_token_expired_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_410_GONE,
+        detail="Sync token expired, sync again without 'since'!",
+    )
+
+
+def _encode(payload: list) -> str:
+    data = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def _decode(token: str):
+    padded = token + "=" * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def invalid_cursor_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor!",
+    )
@@ -1,18 +1,39 @@
 import datetime
-from typing import Literal
+import time
+from typing import Any, Callable, Literal
 
+import anyio
 from fastapi import HTTPException, status
 from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import EmailStr
-from sqlalchemy import select
+from sqlalchemy import event, inspect, select
+from sqlalchemy.exc import MissingGreenlet
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.util import await_only
 
+from app.core.cache import (
+    CacheBackend,
+    TTLCache,
+    make_backend,
+    per_worker_state_allowed,
+)
 from app.core.config import config
+from app.core.metrics import password_hashing_duration
 from app.db.base import User
+from app.schemas.user import CurrentUser
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified tokens -> (subject, type, exp), so a token presented again
+# during its lifetime skips the signature check. Entries never outlive
+# the token's own expiry.
+token_cache = TTLCache(
+    maxsize=config.TOKEN_CACHE_MAX_SIZE,
+    ttl=config.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -22,6 +43,57 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHashingPool:
+    """Runs bcrypt in worker threads so a burst of logins doesn't block the
+    event loop. At most `workers` hashes run at once, the rest queue up."""
+
+    def __init__(self, workers: int):
+        self.limiter = anyio.CapacityLimiter(workers)
+        self.peak_waiting = 0
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        waiting = self.limiter.statistics().tasks_waiting
+        if self.limiter.available_tokens == 0:
+            waiting += 1
+        self.peak_waiting = max(self.peak_waiting, waiting)
+        return await anyio.to_thread.run_sync(
+            self._timed, func, *args, limiter=self.limiter
+        )
+
+    @staticmethod
+    def _timed(func: Callable[..., Any], *args: Any) -> Any:
+        # Only the hashing itself, the wait for a worker is left out
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            password_hashing_duration.observe(
+                time.perf_counter() - start, func.__name__
+            )
+
+    def stats(self) -> dict:
+        statistics = self.limiter.statistics()
+        return {
+            "workers": statistics.total_tokens,
+            "in_progress": statistics.borrowed_tokens,
+            "waiting": statistics.tasks_waiting,
+            "peak_waiting": self.peak_waiting,
+        }
+
+
+password_hashing_pool = PasswordHashingPool(workers=config.PASSWORD_HASHING_WORKERS)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hashing_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hashing_pool.run(
+        verify_password, plain_password, hashed_password
+    )
+
+
 def create_access_token(email: str):
     expire = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(
         minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -33,9 +105,7 @@ def create_access_token(email: str):
     return encoded_jwt
 
 
-def get_subject_for_token_type(
-    token: str, type: Literal["access", "confirmation"]
-) -> str:
+def decode_token(token: str) -> tuple[str | None, str | None, float | None]:
     try:
         payload = jwt.decode(
             token, key=config.SECRET_KEY, algorithms=[config.ALGORITHM]
@@ -44,12 +114,22 @@ def get_subject_for_token_type(
         raise credentials_exception("Token has expired!") from e
     except JWTError as e:
         raise credentials_exception("Invalid token!") from e
+    return payload.get("sub"), payload.get("type"), payload.get("exp")
 
-    email = payload.get("sub")
+
+def get_subject_for_token_type(
+    token: str, type: Literal["access", "confirmation"]
+) -> str:
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        exp = claims[2]
+        token_cache.set(token, claims, ttl=exp - time.time() if exp else None)
+
+    email, token_type, _ = claims
     if email is None:
         raise credentials_exception("Token is missing 'sub' field")
 
-    token_type = payload.get("type")
     if token_type is None or token_type != type:
         raise credentials_exception(f"Token has incorrect type , expected '{type}'")
 
@@ -74,6 +154,114 @@ async def get_user_by_phone(phone_number: str, db: AsyncSession) -> User | None:
         return None
 
 
+class UserCache:
+    """Caches the authenticated user by token subject so protected routes
+    don't have to load the user row on every request.
+
+    A changed user is dropped on commit, only from the backend of the
+    worker that committed. The cache stays off on an in-process backend
+    unless the app is a single process.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(email: str) -> str:
+        return f"user:{email}"
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and per_worker_state_allowed(self.backend)
+
+    async def get(self, email: str) -> CurrentUser | None:
+        if not self.enabled:
+            return None
+        data = await self.backend.get(self._key(email))
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CurrentUser.model_validate(data)
+
+    async def set(self, user: CurrentUser) -> None:
+        if not self.enabled:
+            return
+        await self.backend.set(
+            self._key(user.email), user.model_dump(mode="json"), ttl=self.ttl
+        )
+
+    async def invalidate(self, email: str) -> None:
+        await self.backend.delete(self._key(email))
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+# Session.info key of the emails to drop from user_cache on commit
+STALE_USERS = "stale_user_emails"
+
+user_cache = UserCache(
+    make_backend(
+        "users", maxsize=config.USER_CACHE_MAX_SIZE, ttl=config.USER_CACHE_TTL_SECONDS
+    ),
+    ttl=config.USER_CACHE_TTL_SECONDS,
+)
+
+
+async def get_current_principal(email: str, db: AsyncSession) -> CurrentUser | None:
+    user = await user_cache.get(email)
+    if user is not None:
+        return user
+    db_user = await get_user(email, db=db)
+    if db_user is None:
+        return None
+    user = CurrentUser.model_validate(db_user)
+    await user_cache.set(user)
+    return user
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_stale_user(mapper, connection, target: User) -> None:
+    # The cached principal of a changed row, and the entry under the old
+    # email if the email itself was changed, are dropped once the change is
+    # committed. Dropped at flush, a concurrent request could still read
+    # the committed old row and cache it again.
+    session = object_session(target)
+    if session is None:
+        return
+    history = inspect(target).attrs.email.history
+    session.info.setdefault(STALE_USERS, set()).update({target.email, *history.deleted})
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stale_users(session: Session) -> None:
+    for email in session.info.pop(STALE_USERS, ()):
+        invalidation = user_cache.invalidate(email)
+        try:
+            # The sync session runs in the AsyncSession's greenlet, the
+            # eviction is done before commit() returns
+            await_only(invalidation)
+        except MissingGreenlet:
+            # A plain sync session (e.g. a script), nothing is cached
+            invalidation.close()
+            return
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_users(session: Session) -> None:
+    session.info.pop(STALE_USERS, None)
+
+
 def credentials_exception(exception_details: str) -> HTTPException:
     return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
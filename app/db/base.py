@@ -2,10 +2,15 @@ from datetime import datetime, timezone
 from typing import List
 
 from sqlalchemy import (
+    DDL,
     TIMESTAMP,
+    BigInteger,
     Boolean,
     ForeignKey,
+    Index,
+    Integer,
     String,
+    event,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -17,7 +22,31 @@ class Base(DeclarativeBase):
 
 
 class Task(Base):
+    # On Postgres the migrations hash partition tasks on owner_id, with a
+    # (id, owner_id) primary key (see app/db/partitions.py). The mapping
+    # keeps id alone as the identity, ids still come from one sequence.
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Backs the keyset pagination of a user's tasks
+        Index("ix_tasks_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        # Covers the version query behind the ETag of the list
+        Index("ix_tasks_owner_id_updated_at_id", "owner_id", "updated_at", "id"),
+        # Backs the delta sync (GET /tasks/changes)
+        Index("ix_tasks_owner_id_change_seq_id", "owner_id", "change_seq", "id"),
+        # Trigram indexes backing the search filter on Postgres
+        Index(
+            "ix_tasks_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_tasks_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String)
@@ -32,8 +61,14 @@ class Task(Base):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+    # Position of the last write in the owner's changes (triggers below)
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default="0"
+    )
 
-    owner: Mapped["User"] = relationship(back_populates="tasks")
+    # Lazy loads raise: a relationship touched without being loaded in the
+    # query would cost a statement per row
+    owner: Mapped["User"] = relationship(back_populates="tasks", lazy="raise")
 
 
 class User(Base):
@@ -45,4 +80,154 @@ class User(Base):
     hashed_password: Mapped[str] = mapped_column(String)
     confirmed: Mapped[bool] = mapped_column(Boolean, default=False)
 
-    tasks: Mapped[List["Task"]] = relationship(back_populates="owner")
+    tasks: Mapped[List["Task"]] = relationship(back_populates="owner", lazy="raise")
+
+
+class TaskTombstone(Base):
+    """A deleted task, kept so that syncing clients learn about the delete."""
+
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index(
+            "ix_task_tombstones_owner_id_change_seq_id",
+            "owner_id",
+            "change_seq",
+            "id",
+        ),
+        # Backs the pruning of old tombstones
+        Index("ix_task_tombstones_deleted_at", "deleted_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # No foreign key, the task is gone
+    task_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default="0"
+    )
+
+
+class TaskChangeCounter(Base):
+    """Last change sequence number handed out for an owner's tasks, and the
+    highest one whose tombstones were pruned."""
+
+    __tablename__ = "task_change_counters"
+
+    # No foreign key, the counters live next to the tasks, on their shard
+    owner_id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=False
+    )
+    last_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    pruned_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+# Search support (see app/db/search.py)
+# Postgres needs pg_trgm for the trigram indexes above, SQLite gets an
+# FTS5 trigram table kept in sync with tasks by triggers.
+TASKS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    # Only the indexed columns, the change sequence triggers below update
+    # rows before tasks_fts_ai has indexed them
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au "
+    "AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+)
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+for statement in TASKS_FTS_DDL:
+    event.listen(
+        Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Task.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"),
+)
+
+# Change sequence of the delta sync (GET /tasks/changes)
+# Triggers stamp change_seq on every task write and write the tombstone of
+# every delete, with the owner's next number from task_change_counters, so
+# the writes stay single statements. The counter row stays locked until the
+# transaction ends, so an owner's numbers become visible in order. Rows that
+# already carry a number (moved between partitions) keep it.
+TASK_CHANGE_SEQ_POSTGRESQL_DDL = (
+    "CREATE OR REPLACE FUNCTION next_task_change_seq(owner integer) "
+    "RETURNS bigint LANGUAGE sql AS $$ "
+    "INSERT INTO task_change_counters AS counter (owner_id, last_seq, pruned_seq) "
+    "VALUES (owner, 1, 0) ON CONFLICT (owner_id) "
+    "DO UPDATE SET last_seq = counter.last_seq + 1 RETURNING last_seq $$",
+    "CREATE OR REPLACE FUNCTION stamp_task_change_seq() "
+    "RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+    "IF TG_OP = 'INSERT' THEN "
+    "IF NEW.change_seq = 0 THEN "
+    "NEW.change_seq := next_task_change_seq(NEW.owner_id); END IF; "
+    "ELSIF (NEW.title, NEW.description, NEW.completed, NEW.updated_at) "
+    "IS DISTINCT FROM (OLD.title, OLD.description, OLD.completed, OLD.updated_at) "
+    "THEN NEW.change_seq := next_task_change_seq(NEW.owner_id); END IF; "
+    "RETURN NEW; END $$",
+    "CREATE OR REPLACE FUNCTION record_task_tombstone() "
+    "RETURNS trigger LANGUAGE plpgsql AS $$ BEGIN "
+    "INSERT INTO task_tombstones (task_id, owner_id, deleted_at, change_seq) "
+    "VALUES (OLD.id, OLD.owner_id, now(), next_task_change_seq(OLD.owner_id)); "
+    "RETURN NULL; END $$",
+    "CREATE TRIGGER tasks_change_seq BEFORE INSERT OR UPDATE ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION stamp_task_change_seq()",
+    "CREATE TRIGGER tasks_tombstone AFTER DELETE ON tasks "
+    "FOR EACH ROW EXECUTE FUNCTION record_task_tombstone()",
+)
+# SQLite triggers can't assign NEW, they update the row after the write.
+# SQLite serializes writers, the counter needs no lock ordering there.
+TASK_CHANGE_SEQ_SQLITE_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS tasks_change_seq_ai AFTER INSERT ON tasks "
+    "WHEN new.change_seq = 0 BEGIN "
+    "INSERT INTO task_change_counters (owner_id, last_seq, pruned_seq) "
+    "VALUES (new.owner_id, 1, 0) "
+    "ON CONFLICT (owner_id) DO UPDATE SET last_seq = last_seq + 1; "
+    "UPDATE tasks SET change_seq = (SELECT last_seq FROM task_change_counters "
+    "WHERE owner_id = new.owner_id) WHERE id = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_change_seq_au "
+    "AFTER UPDATE OF title, description, completed, updated_at ON tasks "
+    "WHEN new.title IS NOT old.title OR new.description IS NOT old.description "
+    "OR new.completed IS NOT old.completed OR new.updated_at IS NOT old.updated_at "
+    "BEGIN "
+    "INSERT INTO task_change_counters (owner_id, last_seq, pruned_seq) "
+    "VALUES (new.owner_id, 1, 0) "
+    "ON CONFLICT (owner_id) DO UPDATE SET last_seq = last_seq + 1; "
+    "UPDATE tasks SET change_seq = (SELECT last_seq FROM task_change_counters "
+    "WHERE owner_id = new.owner_id) WHERE id = new.id; END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_change_seq_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO task_change_counters (owner_id, last_seq, pruned_seq) "
+    "VALUES (old.owner_id, 1, 0) "
+    "ON CONFLICT (owner_id) DO UPDATE SET last_seq = last_seq + 1; "
+    "INSERT INTO task_tombstones (task_id, owner_id, deleted_at, change_seq) "
+    "VALUES (old.id, old.owner_id, CURRENT_TIMESTAMP, "
+    "(SELECT last_seq FROM task_change_counters WHERE owner_id = old.owner_id)); "
+    "END",
+)
+
+# After every table, the triggers write to the counters and tombstones
+for dialect, statements in (
+    ("postgresql", TASK_CHANGE_SEQ_POSTGRESQL_DDL),
+    ("sqlite", TASK_CHANGE_SEQ_SQLITE_DDL),
+):
+    for statement in statements:
+        event.listen(
+            Base.metadata, "after_create", DDL(statement).execute_if(dialect=dialect)
+        )
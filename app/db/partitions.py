@@ -0,0 +1,152 @@
+"""Manage the hash partitions of the tasks table on Postgres.
+They are created by migration c4a2e9d1f6b8.
+
+    python -m app.db.partitions list
+    python -m app.db.partitions split tasks_p3
+    python -m app.db.partitions detach tasks_p3
+    python -m app.db.partitions attach tasks_p3 16 3
+"""
+
+import argparse
+import asyncio
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+PARTITIONED_TABLE = "tasks"
+
+_HASH_BOUND = re.compile(r"modulus (\d+), remainder (\d+)", re.IGNORECASE)
+
+
+async def list_partitions(conn: AsyncConnection, table: str = PARTITIONED_TABLE):
+    """Name, bound, estimated rows and size on disk of every partition."""
+    result = await conn.execute(
+        text(
+            "SELECT child.relname AS name, "
+            "pg_get_expr(child.relpartbound, child.oid) AS bound, "
+            "child.reltuples::bigint AS rows, "
+            "pg_total_relation_size(child.oid) AS bytes "
+            "FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table AND child.relkind IN ('r', 'p') "
+            "ORDER BY child.relname"
+        ),
+        {"table": table},
+    )
+    return [dict(row) for row in result.mappings()]
+
+
+def hash_bound(bound: str) -> tuple[int, int]:
+    """(modulus, remainder) of a hash partition bound."""
+    match = _HASH_BOUND.search(bound)
+    if match is None:
+        raise ValueError(f"Not a hash partition bound: {bound}")
+    return int(match[1]), int(match[2])
+
+
+async def split_partition(
+    conn: AsyncConnection, name: str, table: str = PARTITIONED_TABLE
+) -> list[str]:
+    """Split a hash partition in two, doubling its modulus, and move its
+    rows over. Returns the names of the new partitions.
+
+    Holds a lock on the table until the transaction commits, the owners
+    of the partition can't write in the meantime.
+    """
+    partitions = {p["name"]: p for p in await list_partitions(conn, table)}
+    if name not in partitions:
+        raise ValueError(f"{name} is not a partition of {table}")
+    modulus, remainder = hash_bound(partitions[name]["bound"])
+
+    quote = conn.dialect.identifier_preparer.quote
+    await conn.execute(
+        text(f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}")
+    )
+    created = []
+    for new_remainder in (remainder, remainder + modulus):
+        new_name = f"{table}_p{new_remainder}_of_{modulus * 2}"
+        await conn.execute(
+            text(
+                f"CREATE TABLE {quote(new_name)} PARTITION OF {quote(table)} "
+                f"FOR VALUES WITH (MODULUS {modulus * 2}, REMAINDER {new_remainder})"
+            )
+        )
+        created.append(new_name)
+    await conn.execute(text(f"INSERT INTO {quote(table)} SELECT * FROM {quote(name)}"))
+    await conn.execute(text(f"DROP TABLE {quote(name)}"))
+    for new_name in created:
+        await conn.execute(text(f"ANALYZE {quote(new_name)}"))
+    return created
+
+
+async def detach_partition(
+    conn: AsyncConnection, name: str, table: str = PARTITIONED_TABLE
+) -> None:
+    """Turn a partition into a standalone table, e.g. to archive or move
+    it. The owners it covers can't create tasks until one is attached."""
+    quote = conn.dialect.identifier_preparer.quote
+    await conn.execute(
+        text(f"ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}")
+    )
+
+
+async def attach_partition(
+    conn: AsyncConnection,
+    name: str,
+    modulus: int,
+    remainder: int,
+    table: str = PARTITIONED_TABLE,
+) -> None:
+    """Attach a table as the hash partition (modulus, remainder). Postgres
+    scans it to check every row belongs there."""
+    quote = conn.dialect.identifier_preparer.quote
+    await conn.execute(
+        text(
+            f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} "
+            f"FOR VALUES WITH (MODULUS {int(modulus)}, REMAINDER {int(remainder)})"
+        )
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    from app.db.session import engine
+
+    try:
+        async with engine.begin() as conn:
+            if conn.dialect.name != "postgresql":
+                raise SystemExit("Partitioning is only set up on Postgres")
+            if args.command == "list":
+                for partition in await list_partitions(conn):
+                    print(
+                        f"{partition['name']:<24} {partition['bound']:<48} "
+                        f"{partition['rows']:>12} rows "
+                        f"{partition['bytes'] / 1e6:>10.1f} MB"
+                    )
+            elif args.command == "split":
+                created = await split_partition(conn, args.name)
+                print(f"Split {args.name} into {', '.join(created)}")
+            elif args.command == "detach":
+                await detach_partition(conn, args.name)
+                print(f"Detached {args.name}")
+            else:
+                await attach_partition(conn, args.name, args.modulus, args.remainder)
+                print(f"Attached {args.name}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List the partitions with their size")
+    split = commands.add_parser("split", help="Split a hot partition in two")
+    split.add_argument("name")
+    detach = commands.add_parser("detach", help="Detach a partition")
+    detach.add_argument("name")
+    attach = commands.add_parser("attach", help="Attach a table as a partition")
+    attach.add_argument("name")
+    attach.add_argument("modulus", type=int)
+    attach.add_argument("remainder", type=int)
+    asyncio.run(main(parser.parse_args()))
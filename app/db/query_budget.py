@@ -0,0 +1,79 @@
+import logging
+from typing import Optional
+
+from fastapi import Request
+
+from app.core.config import GlobalConfig
+from app.core.metrics import RequestStats, current_request_stats, route_template
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request sent more SQL statements than its route allows, or the same
+    statement over and over (an N+1 pattern)."""
+
+
+def query_budget(max_queries: Optional[int] = None, allow_repeats: bool = False):
+    """Route dependency declaring how many statements a request may send,
+    e.g. `dependencies=[Depends(query_budget(2))]`.
+
+    Routes that legitimately repeat a statement (batches...) pass
+    allow_repeats=True to skip the N+1 detection. Enforced according to
+    SQL_QUERY_BUDGET_MODE.
+    """
+
+    async def declare_query_budget(request: Request) -> None:
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.route = route_template(request.scope)
+            stats.query_budget = max_queries
+            stats.allow_repeated_queries = allow_repeats
+
+    return declare_query_budget
+
+
+def check_query_budget(
+    stats: RequestStats, statement: str, settings: GlobalConfig
+) -> None:
+    """Called for every statement of a request, flags the request the
+    moment it goes over its budget or repeats a statement too often."""
+    mode = settings.SQL_QUERY_BUDGET_MODE
+    # Transaction control (the savepoints of nested sessions) isn't a query
+    if mode == "off" or "SAVEPOINT" in statement:
+        return
+    stats.queries[statement] += 1
+    count = sum(stats.queries.values())
+    route = stats.route or "unknown route"
+
+    if stats.query_budget is not None and count == stats.query_budget + 1:
+        report(
+            mode,
+            f"{route} went over its budget of {stats.query_budget} queries",
+            statement,
+            stats,
+        )
+    repeats = stats.queries[statement]
+    if (
+        not stats.allow_repeated_queries
+        and repeats == settings.SQL_N_PLUS_ONE_THRESHOLD
+    ):
+        report(
+            mode,
+            f"{route} sent the same query {repeats} times (N+1?)",
+            statement,
+            stats,
+        )
+
+
+def report(mode: str, message: str, statement: str, stats: RequestStats) -> None:
+    if mode == "raise":
+        raise QueryBudgetExceeded(f"{message}: {statement}")
+    logger.warning(
+        message,
+        extra={
+            "statement": statement,
+            "queries": sum(stats.queries.values()),
+            "budget": stats.query_budget,
+        },
+    )
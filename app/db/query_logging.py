@@ -0,0 +1,55 @@
+import logging
+import random
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import GlobalConfig, config
+from app.core.metrics import record_db_statement
+from app.db.query_budget import check_query_budget
+
+logger = logging.getLogger(__name__)
+
+
+def install_query_logging(engine: AsyncEngine, settings: GlobalConfig = config):
+    """Time every statement run by the engine and log the slow ones, plus a
+    random sample of the rest (SQL_LOG_SAMPLE_RATE). The timings also feed
+    the per-request metrics (app/core/metrics.py) and the query budgets
+    (app/db/query_budget.py)."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        # Kept on the statement's execution context, so a statement that
+        # fails leaves nothing behind. The few run without one use the
+        # connection.
+        if context is not None:
+            context.query_start_time = time.perf_counter()
+        else:
+            conn.info["query_start_time"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def log_query(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            start = context.query_start_time
+        else:
+            start = conn.info.pop("query_start_time")
+        duration = time.perf_counter() - start
+        stats = record_db_statement(duration)
+        if stats is not None:
+            check_query_budget(stats, statement, settings)
+        duration_ms = duration * 1000
+        slow = duration_ms >= settings.SQL_SLOW_QUERY_MS
+        if not slow and random.random() >= settings.SQL_LOG_SAMPLE_RATE:
+            return
+        # Parameters are left out on purpose, they can hold user data
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            "slow query" if slow else "query",
+            extra={
+                "statement": statement,
+                "duration_ms": round(duration_ms, 3),
+                "rowcount": cursor.rowcount,
+                "executemany": executemany,
+            },
+        )
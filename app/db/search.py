@@ -0,0 +1,50 @@
+from sqlalchemy import (
+    Integer,
+    Select,
+    column,
+    func,
+    literal_column,
+    or_,
+    select,
+    table,
+)
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.base import Task
+
+# FTS5 trigram tokens are three characters long, shorter terms can't be
+# answered from the index
+MIN_FTS_TERM_LENGTH = 3
+
+tasks_fts = table("tasks_fts", column("rowid", Integer), column("rank"))
+
+
+def apply_task_search(
+    query: Select, search: str, dialect_name: str
+) -> tuple[Select, ColumnElement | None]:
+    """Filter a tasks query on title/description and return it along with
+    the ordering that puts the most relevant tasks first (None when the
+    backend can't rank the matches)."""
+    pattern = f"%{search}%"
+
+    if dialect_name == "sqlite" and len(search) >= MIN_FTS_TERM_LENGTH:
+        # Quoted as an FTS5 string so the term is matched as a substring
+        fts_query = '"' + search.replace('"', '""') + '"'
+        matches = (
+            select(tasks_fts.c.rowid, tasks_fts.c.rank)
+            .where(literal_column("tasks_fts").op("MATCH")(fts_query))
+            .subquery("matches")
+        )
+        query = query.join(matches, matches.c.rowid == Task.id)
+        # FTS5 rank is bm25(), lower is better
+        return query, matches.c.rank.asc()
+
+    # On Postgres ILIKE on both columns is served by the pg_trgm GIN indexes
+    query = query.where(or_(Task.title.ilike(pattern), Task.description.ilike(pattern)))
+    if dialect_name == "postgresql":
+        relevance = func.greatest(
+            func.similarity(Task.title, search),
+            func.similarity(func.coalesce(Task.description, ""), search),
+        )
+        return query, relevance.desc()
+    return query, None
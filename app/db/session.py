@@ -1,13 +1,77 @@
+import time
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from app.core.config import GlobalConfig, config
+from app.db.query_logging import install_query_logging
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that keeps track of how long checkouts wait."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+
+# 1. Engine factory, shared by the app and the test suite
+def make_engine(url: str, settings: GlobalConfig = config, **kwargs) -> AsyncEngine:
+    database_url = make_url(url)
+    in_memory = database_url.get_backend_name() == "sqlite" and (
+        database_url.database in (None, "", ":memory:")
+    )
+    if not in_memory:
+        # In-memory SQLite lives on a single connection, it has no pool to tune
+        kwargs.setdefault("poolclass", TimedQueuePool)
+        kwargs.setdefault("pool_size", settings.DB_POOL_SIZE)
+        kwargs.setdefault("max_overflow", settings.DB_MAX_OVERFLOW)
+        kwargs.setdefault("pool_timeout", settings.DB_POOL_TIMEOUT)
+        kwargs.setdefault("pool_recycle", settings.DB_POOL_RECYCLE)
+        kwargs.setdefault("pool_pre_ping", settings.DB_POOL_PRE_PING)
+    engine = create_async_engine(url, **kwargs)
+    install_query_logging(engine, settings)
+    return engine
+
+
+def pool_stats(pool: Pool) -> dict:
+    if not isinstance(pool, TimedQueuePool):
+        return {"pool": pool.status()}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "timeout": pool.timeout(),
+        "checkouts": pool.wait_count,
+        "wait_total_ms": round(pool.wait_total * 1000, 3),
+        "wait_max_ms": round(pool.wait_max * 1000, 3),
+    }
 
-from app.core.config import config
 
 # 2. Create the Async Engine
-engine = create_async_engine(
+engine = make_engine(
     config.DATABASE_URL,
-    echo=True,  # Log SQL queries to console (useful for debugging)
+    echo=config.DB_ECHO,  # Log raw SQL to the console (useful for debugging)
 )
 
 # 3. Create the Session Factory
@@ -19,6 +83,19 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+# Read-only engine on the replica, the primary itself when there is none
+read_engine = (
+    make_engine(config.READ_DATABASE_URL, echo=config.DB_ECHO)
+    if config.READ_DATABASE_URL
+    else engine
+)
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+
 # 5. Dependency for FastAPI
 # This function is injected into your routes
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -27,3 +104,12 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+
+async def get_replica_db() -> AsyncGenerator[AsyncSession, None]:
+    # Routes should use app.api.deps.get_read_db, which keeps read-your-writes
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,50 @@
+from typing import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import GlobalConfig, config
+from app.db.session import make_engine
+
+
+def shard_for_owner(owner_id: int, shard_count: int) -> int:
+    """Index of the shard holding the tasks of `owner_id`."""
+    # Plain modulo, the same in every process and every run. Changing the
+    # number of shards moves most owners, their rows have to be copied over.
+    return owner_id % shard_count
+
+
+class ShardRouter:
+    """Engines of the task shards and the sessions on an owner's shard.
+
+    Users stay on the directory database (DATABASE_URL), all the tasks of
+    an owner live on a single shard so every task query stays on one
+    database. Task ids are only unique within a shard, which is enough
+    since every task route filters on the owner too. Without shard URLs
+    the tasks stay on the directory database.
+    """
+
+    def __init__(self, urls: Sequence[str], settings: GlobalConfig = config):
+        self.engines: list[AsyncEngine] = [
+            make_engine(url, settings, echo=settings.DB_ECHO) for url in urls
+        ]
+        self._sessionmakers = [
+            async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            for engine in self.engines
+        ]
+
+    @property
+    def sharded(self) -> bool:
+        return bool(self.engines)
+
+    def engine_for(self, owner_id: int) -> AsyncEngine:
+        return self.engines[shard_for_owner(owner_id, len(self.engines))]
+
+    def session(self, owner_id: int) -> AsyncSession:
+        return self._sessionmakers[shard_for_owner(owner_id, len(self.engines))]()
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+
+task_shards = ShardRouter(config.TASK_SHARD_URLS)
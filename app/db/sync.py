@@ -0,0 +1,69 @@
+"""Pruning of the old tombstones of the delta sync (GET /tasks/changes).
+Change sequence numbers are stamped by triggers (app/db/base.py).
+
+    python -m app.db.sync prune [--days 30]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.base import TaskChangeCounter, TaskTombstone
+
+
+async def prune_tombstones(conn: AsyncConnection, retention: timedelta) -> int:
+    """Delete the tombstones older than `retention` and return how many.
+
+    The counters remember the last pruned sequence number, sync tokens
+    from before it may have missed a delete and are refused.
+    """
+    cutoff = datetime.now(timezone.utc) - retention
+    old = TaskTombstone.deleted_at < cutoff
+    pruned = await conn.execute(
+        select(TaskTombstone.owner_id, func.max(TaskTombstone.change_seq))
+        .where(old)
+        .group_by(TaskTombstone.owner_id)
+    )
+    pruned = [{"owner": owner_id, "seq": seq} for owner_id, seq in pruned]
+    if not pruned:
+        return 0
+    await conn.execute(
+        update(TaskChangeCounter)
+        .where(
+            (TaskChangeCounter.owner_id == bindparam("owner"))
+            & (TaskChangeCounter.pruned_seq < bindparam("seq"))
+        )
+        .values(pruned_seq=bindparam("seq")),
+        pruned,
+    )
+    result = await conn.execute(delete(TaskTombstone).where(old))
+    return result.rowcount
+
+
+async def main(args: argparse.Namespace) -> None:
+    from app.db.session import engine
+    from app.db.shards import task_shards
+
+    # The tombstones live with the tasks, on the shards when there are some
+    engines = task_shards.engines or [engine]
+    try:
+        for shard in engines:
+            async with shard.begin() as conn:
+                count = await prune_tombstones(conn, timedelta(days=args.days))
+            print(f"{shard.url.render_as_string()}: pruned {count} tombstones")
+    finally:
+        for shard in {engine, *engines}:
+            await shard.dispose()
+
+
+if __name__ == "__main__":
+    from app.core.config import config
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    prune = commands.add_parser("prune", help="Delete the old tombstones")
+    prune.add_argument("--days", type=int, default=config.TASK_TOMBSTONE_RETENTION_DAYS)
+    asyncio.run(main(parser.parse_args()))
@@ -1,19 +1,30 @@
 from contextlib import asynccontextmanager
 
+from asgi_correlation_id import CorrelationIdMiddleware
 from fastapi import FastAPI
 
 from app.api.v1.router import api_router
+from app.core.cache import close_backends
 from app.core.config import config
-from app.db.session import engine
+from app.core.logging_conf import configure_logging
+from app.core.metrics import MetricsMiddleware
+from app.db.session import engine, read_engine
+from app.db.shards import task_shards
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    configure_logging()
     try:
         yield
     finally:
         await engine.dispose()
+        await read_engine.dispose()
+        await task_shards.dispose()
+        await close_backends()
 
 
 app = FastAPI(title=config.APP_NAME, lifespan=lifespan)
+app.add_middleware(CorrelationIdMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.include_router(api_router, prefix=config.API_V1_PREFIX)
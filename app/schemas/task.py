@@ -1,7 +1,7 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Literal, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 
 # Input Schema (Client -> API)
@@ -26,3 +26,60 @@ class TaskUpdate(BaseModel):
     title: str | None = Field(default=None, min_length=1)
     description: str | None = None
     completed: bool | None = None
+
+
+# Bulk endpoints
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+
+class TaskBulkResult(BaseModel):
+    id: int
+    status: Literal["updated", "deleted", "not_found"]
+    task: Optional[TaskOut] = None
+
+
+# Import endpoint
+class TaskImportError(BaseModel):
+    line: int
+    errors: list[str]
+
+
+class TaskImportResult(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    # Only the first TASKS_IMPORT_MAX_ERRORS failures are detailed
+    errors: list[TaskImportError] = []
+
+
+# Delta sync
+class TaskChanges(BaseModel):
+    changed: list[TaskOut]
+    # Ids of the tasks deleted since the token
+    deleted: list[int]
+    # Sent back as ?since= to get the changes that follow this response
+    sync_token: Optional[str] = None
+    has_more: bool
+
+
+# Stats endpoint
+class TaskDayStats(BaseModel):
+    day: date
+    total: int
+    completed: int
+
+
+class TaskStats(BaseModel):
+    total: int
+    completed: int
+    open: int
+    # Only with ?by_day=true, per day of creation
+    by_day: Optional[list[TaskDayStats]] = None
+
+
+# Prebuilt adapters for the JSON responses (see app/api/responses.py)
+task_adapter = TypeAdapter(TaskOut)
+task_list_adapter = TypeAdapter(list[TaskOut])
+task_bulk_results_adapter = TypeAdapter(list[TaskBulkResult])
+task_changes_adapter = TypeAdapter(TaskChanges)
+task_stats_adapter = TypeAdapter(TaskStats)
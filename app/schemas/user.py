@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter
 from pydantic_extra_types.phone_numbers import PhoneNumber
 
 PhoneNumber.default_region_code = "EG"
@@ -22,3 +22,16 @@ class UserOut(BaseModel):
     email: EmailStr
     confirmed: bool
     phone_number: PhoneNumber | None
+
+
+# Authenticated principal, a detached copy of the user row that can be cached
+class CurrentUser(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    id: int
+    email: EmailStr
+    confirmed: bool
+    phone_number: PhoneNumber | None = None
+
+
+# Prebuilt adapter for the JSON responses (see app/api/responses.py)
+user_adapter = TypeAdapter(UserOut)
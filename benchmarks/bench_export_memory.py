@@ -0,0 +1,164 @@
+"""Peak RSS of GET /tasks/export against the number of exported tasks.
+
+Every measurement runs in a fresh process so the peaks don't leak into
+each other. GET /tasks/?limit=N, which materializes the whole list, is
+measured alongside for comparison.
+
+    python -m benchmarks.bench_export_memory [--rows 1000 10000 100000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+API = "/api/v1"
+EMAIL = "export@example.com"
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def seed(rows: int) -> None:
+    from sqlalchemy import insert
+
+    from app.db.base import Base, Task, User
+    from app.db.session import engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        user_id = (
+            await conn.execute(
+                insert(User)
+                .values(email=EMAIL, hashed_password="-", confirmed=True)
+                .returning(User.id)
+            )
+        ).scalar_one()
+        now = datetime.now(timezone.utc)
+        batch = 10_000
+        for start in range(0, rows, batch):
+            await conn.execute(
+                insert(Task),
+                [
+                    {
+                        "title": f"Task {i}",
+                        "description": "x" * 64,
+                        "completed": i % 2 == 0,
+                        "owner_id": user_id,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for i in range(start, min(start + batch, rows))
+                ],
+            )
+    await engine.dispose()
+
+
+async def measure(path: str) -> dict:
+    from app.core.security import create_access_token
+    from app.db.session import engine
+    from app.main import app
+
+    token = create_access_token(email=EMAIL)
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    received = {"bytes": 0, "status": None}
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client only goes away once the whole body has been sent
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        # The body is counted and dropped, like a client writing it to disk
+        if message["type"] == "http.response.start":
+            received["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            received["bytes"] += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_done.set()
+
+    before = peak_rss_mb()
+    await app(scope, receive, send)
+    await engine.dispose()
+    return {
+        "status": received["status"],
+        "bytes": received["bytes"],
+        "rss_before_mb": round(before, 1),
+        "rss_peak_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_child(*args: str, env: dict) -> str:
+    return subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_export_memory", *args],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        command, value = args.child
+        if command == "seed":
+            asyncio.run(seed(int(value)))
+        else:
+            print(json.dumps(asyncio.run(measure(value))))
+        return
+
+    print(f"{'rows':>8} {'endpoint':<10} {'MB sent':>8} {'peak RSS':>9} {'growth':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            env = dict(
+                os.environ,
+                DEV_DATABASE_URL=f"sqlite+aiosqlite:///{tmp}/export_{rows}.db",
+            )
+            run_child("--child", "seed", str(rows), env=env)
+            for name, path in (
+                ("export", f"{API}/tasks/export"),
+                ("list", f"{API}/tasks/?limit={rows}"),
+            ):
+                result = json.loads(run_child("--child", "measure", path, env=env))
+                assert result["status"] == 200, result
+                print(
+                    f"{rows:>8} {name:<10} {result['bytes'] / 1e6:>8.1f} "
+                    f"{result['rss_peak_mb']:>7.1f}MB "
+                    f"{result['rss_peak_mb'] - result['rss_before_mb']:>6.1f}MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Load test: GET /tasks latency while /auth/login is saturated.
+
+Drives a steady stream of task listings with and without a concurrent
+login flood, once with bcrypt on the worker pool and once with bcrypt run
+inline on the event loop, to show the difference the pool makes.
+
+    DEV_DATABASE_URL=sqlite+aiosqlite:///./bench.db \\
+        python -m benchmarks.bench_login_saturation [--logins 4] [--reads 100]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+import app.api.v1.endpoints.auth as auth_endpoints
+from app.core.security import verify_password
+from app.db.base import Base
+from app.db.session import engine
+from app.main import app
+
+API = "/api/v1"
+EMAIL = "bench@example.com"
+PASSWORD = "benchpassword"
+
+
+async def verify_password_inline(plain_password: str, hashed_password: str) -> bool:
+    # The old behaviour, bcrypt blocking the event loop
+    return verify_password(plain_password, hashed_password)
+
+
+async def setup(client: AsyncClient) -> dict:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await client.post(f"{API}/auth/signup", json={"email": EMAIL, "password": PASSWORD})
+    res = await client.post(
+        f"{API}/auth/login", data={"username": EMAIL, "password": PASSWORD}
+    )
+    headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+    for i in range(20):
+        await client.post(f"{API}/tasks/", headers=headers, json={"title": f"Task {i}"})
+    return headers
+
+
+async def login_flood(client: AsyncClient, stop: asyncio.Event) -> int:
+    logins = 0
+    while not stop.is_set():
+        await client.post(
+            f"{API}/auth/login", data={"username": EMAIL, "password": PASSWORD}
+        )
+        logins += 1
+    return logins
+
+
+async def measure_reads(client: AsyncClient, headers: dict, reads: int) -> list:
+    latencies = []
+    for _ in range(reads):
+        start = time.perf_counter()
+        await client.get(f"{API}/tasks/", headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def scenario(client, headers, reads: int, logins: int) -> tuple[list, int]:
+    stop = asyncio.Event()
+    flood = [asyncio.create_task(login_flood(client, stop)) for _ in range(logins)]
+    # Give the flood time to fill the pool
+    await asyncio.sleep(0.2 if logins else 0)
+    latencies = await measure_reads(client, headers, reads)
+    stop.set()
+    return latencies, sum(await asyncio.gather(*flood))
+
+
+def report(name: str, latencies: list, logins: int) -> None:
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<28} p50={quantiles[49]:8.2f}ms p95={quantiles[94]:8.2f}ms "
+        f"max={max(latencies):8.2f}ms logins={logins}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=4, help="concurrent logins")
+    parser.add_argument("--reads", type=int, default=100, help="task listings")
+    args = parser.parse_args()
+
+    engine.echo = False
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        headers = await setup(client)
+
+        latencies, _ = await scenario(client, headers, args.reads, 0)
+        report("idle", latencies, 0)
+
+        latencies, logins = await scenario(client, headers, args.reads, args.logins)
+        report("login flood, worker pool", latencies, logins)
+
+        pooled = auth_endpoints.verify_password_async
+        auth_endpoints.verify_password_async = verify_password_inline
+        try:
+            latencies, logins = await scenario(client, headers, args.reads, args.logins)
+            report("login flood, inline bcrypt", latencies, logins)
+        finally:
+            auth_endpoints.verify_password_async = pooled
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
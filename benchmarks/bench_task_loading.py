@@ -0,0 +1,80 @@
+"""Time to load and serialize a page of tasks: Task entities vs column rows.
+
+    DEV_DATABASE_URL=sqlite+aiosqlite:///./bench.db \\
+        python -m benchmarks.bench_task_loading [--rows 100] [--repeat 200]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select
+
+from app.api.responses import json_response
+from app.api.v1.endpoints.tasks import TASK_OUT_COLUMNS
+from app.db.base import Base, Task, User
+from app.db.session import AsyncSessionLocal, engine
+from app.schemas.task import task_list_adapter
+
+
+async def seed(rows: int) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        user_id = (
+            await conn.execute(
+                insert(User)
+                .values(email="load@example.com", hashed_password="-")
+                .returning(User.id)
+            )
+        ).scalar_one()
+        now = datetime.now(timezone.utc)
+        await conn.execute(
+            insert(Task),
+            [
+                {
+                    "title": f"Task {i}",
+                    "description": "x" * 64,
+                    "owner_id": user_id,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(rows)
+            ],
+        )
+    return user_id
+
+
+async def entities(db, user_id: int) -> bytes:
+    tasks = (await db.scalars(select(Task).where(Task.owner_id == user_id))).all()
+    return json_response(task_list_adapter, tasks).body
+
+
+async def rows(db, user_id: int) -> bytes:
+    query = select(*TASK_OUT_COLUMNS).where(Task.owner_id == user_id)
+    tasks = (await db.execute(query)).all()
+    return json_response(task_list_adapter, tasks).body
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="tasks per page")
+    parser.add_argument("--repeat", type=int, default=200, help="pages per run")
+    args = parser.parse_args()
+
+    engine.echo = False
+    user_id = await seed(args.rows)
+    for name, load in (("Task entities", entities), ("column rows", rows)):
+        # A fresh session per page, like a request
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            async with AsyncSessionLocal() as db:
+                await load(db, user_id)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{name:<14} {elapsed * 1e6:10.1f}µs per {args.rows} rows")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
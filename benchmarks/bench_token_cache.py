@@ -0,0 +1,49 @@
+"""Microbenchmark of access token verification, with and without the
+verified token cache.
+
+    python -m benchmarks.bench_token_cache [--iterations 20000]
+"""
+
+import argparse
+import timeit
+from functools import partial
+
+from app.core.security import (
+    create_access_token,
+    get_subject_for_token_type,
+    token_cache,
+)
+
+
+def uncached(token: str) -> str:
+    token_cache.clear()
+    return get_subject_for_token_type(token, "access")
+
+
+def cached(token: str) -> str:
+    return get_subject_for_token_type(token, "access")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    token = create_access_token(email="bench@example.com")
+    cached(token)  # warm the cache
+
+    results = {}
+    for name, fn in (("uncached", uncached), ("cached", cached)):
+        seconds = min(
+            timeit.repeat(partial(fn, token), number=args.iterations, repeat=3)
+        )
+        results[name] = args.iterations / seconds
+        print(
+            f"{name:>8}: {results[name]:>12,.0f} calls/s "
+            f"({seconds / args.iterations * 1e6:.2f} us/call)"
+        )
+    print(f" speedup: {results['cached'] / results['uncached']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,16 @@
 import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient
 
+from app.api.deps import recent_writers
+from app.core.security import (
+    create_access_token,
+    get_subject_for_token_type,
+    token_cache,
+)
+from app.db.session import get_replica_db
+from app.main import app
+
 
 @pytest.mark.anyio
 async def test_signup(client: AsyncClient):
@@ -15,6 +25,17 @@ async def test_signup(client: AsyncClient):
     assert "hashed_password" not in data  # Should not expose password
 
 
+@pytest.mark.anyio
+async def test_signup_query_count(client: AsyncClient, assert_query_count):
+    # The email lookup and the INSERT ... RETURNING, no refresh
+    with assert_query_count(2):
+        response = await client.post(
+            "/api/v1/auth/signup",
+            json={"email": "counted@example.com", "password": "strongpassword"},
+        )
+    assert response.status_code == 201
+
+
 @pytest.mark.anyio
 async def test_signup_existing_email(client: AsyncClient):
     # Create first user
@@ -64,3 +85,38 @@ async def test_login_wrong_password(client: AsyncClient):
         data={"username": "wrongpass@example.com", "password": "wrongpassword"},
     )
     assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_token_verification_is_cached():
+    token_cache.clear()
+    token = create_access_token(email="cache@example.com")
+
+    assert get_subject_for_token_type(token, "access") == "cache@example.com"
+    assert get_subject_for_token_type(token, "access") == "cache@example.com"
+    assert token_cache.stats()["hits"] == 1
+
+    # The cached claims are still checked against the expected type
+    with pytest.raises(HTTPException):
+        get_subject_for_token_type(token, "confirmation")
+
+
+@pytest.mark.anyio
+async def test_new_user_reads_from_the_primary(client: AsyncClient, replica_session):
+    # The replica hasn't received the signup yet
+    app.dependency_overrides[get_replica_db] = lambda: replica_session
+    credentials = {"email": "fresh@example.com", "password": "strongpassword"}
+    response = await client.post("/api/v1/auth/signup", json=credentials)
+    assert response.status_code == 201
+    await recent_writers.clear()
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": credentials["email"], "password": credentials["password"]},
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "fresh@example.com"
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    assert response.status_code == 200
@@ -0,0 +1,33 @@
+import os
+import sys
+from pathlib import Path
+
+import anyio
+import pytest
+
+ROOT = Path(__file__).parent.parent
+
+
+@pytest.mark.anyio
+async def test_bench_api_keeps_the_sqlite_baseline(tmp_path):
+    # The load test drops and reseeds its database, it gets its own file.
+    # Latencies depend on the machine, the statements per request don't.
+    env = {
+        key: value for key, value in os.environ.items() if not key.startswith("DEV_")
+    }
+    env["ENV_STATE"] = "dev"
+    env["DEV_DATABASE_URL"] = f"sqlite+aiosqlite:///{tmp_path / 'bench.db'}"
+    result = await anyio.run_process(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_api",
+            "--compare",
+            "sqlite",
+            "--queries-only",
+        ],
+        cwd=ROOT,
+        env=env,
+        check=False,
+    )
+    assert result.returncode == 0, result.stdout.decode() + result.stderr.decode()
@@ -0,0 +1,95 @@
+from fnmatch import fnmatchcase
+
+import pytest
+from fastapi import Request, Response
+
+from app.core.cache import RedisBackend, ResponseCache
+
+
+class FakeRedis:
+    """The part of redis.asyncio.Redis RedisBackend uses, kept in a dict."""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+        self.expiries: dict[str, int | None] = {}
+
+    async def get(self, name: str) -> bytes | None:
+        return self.values.get(name)
+
+    async def set(self, name: str, value: str, px: int | None = None) -> bool:
+        self.values[name] = value.encode()
+        self.expiries[name] = px
+        return True
+
+    async def delete(self, *names: str) -> int:
+        deleted = [name for name in names if self.values.pop(name, None)]
+        for name in deleted:
+            del self.expiries[name]
+        return len(deleted)
+
+    async def scan_iter(self, match: str):
+        for name in list(self.values):
+            if fnmatchcase(name, match):
+                yield name
+
+    async def aclose(self) -> None:
+        pass
+
+
+def make_request(path: str, query: str = "") -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query.encode(),
+            "headers": [],
+        }
+    )
+
+
+@pytest.mark.anyio
+async def test_redis_backend():
+    redis = FakeRedis()
+    backend = RedisBackend(redis, prefix="todo:users:")
+    other = RedisBackend(redis, prefix="todo:writers:")
+
+    await backend.set("user:a", {"id": 1}, ttl=1.5)
+    await other.set("writer:a", True, ttl=10)
+    assert await backend.get("user:a") == {"id": 1}
+    assert redis.expiries["todo:users:user:a"] == 1500
+    assert await backend.get("user:b") is None
+    # A TTL of 0 caches nothing
+    await backend.set("user:b", {"id": 2}, ttl=0)
+    assert await backend.get("user:b") is None
+
+    await backend.delete("user:a")
+    assert await backend.get("user:a") is None
+    await backend.set("user:a", {"id": 1}, ttl=1)
+    # Only the keys under its own prefix are cleared
+    await backend.clear()
+    assert await backend.get("user:a") is None
+    assert await other.get("writer:a") is True
+
+
+@pytest.mark.anyio
+async def test_response_cache_on_redis():
+    redis = FakeRedis()
+    cache = ResponseCache(RedisBackend(redis, prefix="todo:"), 30, "tasks")
+    request = make_request("/api/v1/tasks/", "skip=0&limit=5")
+
+    key = await cache.key(1, request)
+    await cache.set(key, Response(b"[]", headers={"etag": 'W/"1"'}))
+    assert (await cache.get(key)).body == b"[]"
+    # Versions outlive the responses cached under them
+    assert redis.expiries["todo:tasks:1:version"] == 24 * 3600 * 1000
+    assert redis.expiries[f"todo:{key}"] == 30 * 1000
+
+    # A write moves the owner to a new version, the old response is
+    # unreachable
+    await cache.invalidate(1)
+    new_key = await cache.key(1, request)
+    assert new_key != key
+    assert await cache.get(new_key) is None
+    # Other owners keep theirs
+    assert await cache.key(2, request) == await cache.key(2, request)
@@ -0,0 +1,107 @@
+import pytest
+from httpx import AsyncClient
+
+from app.api.v1.endpoints import internal
+from app.core.config import config
+from app.db.session import TimedQueuePool, make_engine
+from app.db.shards import ShardRouter
+
+
+@pytest.mark.anyio
+async def test_db_pool_stats(client: AsyncClient, monkeypatch, tmp_path):
+    response = await client.get("/api/v1/internal/db-pool")
+    assert response.status_code == 200
+    assert list(response.json()) == ["primary"]
+
+    # Each engine reports its own pool
+    shards = ShardRouter(
+        [f"sqlite+aiosqlite:///{tmp_path}/shard_{i}.db" for i in range(2)]
+    )
+    monkeypatch.setattr(internal, "task_shards", shards)
+    monkeypatch.setattr(
+        internal,
+        "read_engine",
+        make_engine(f"sqlite+aiosqlite:///{tmp_path}/replica.db"),
+    )
+    response = await client.get("/api/v1/internal/db-pool")
+    stats = response.json()
+    assert list(stats) == ["primary", "replica", "shard_0", "shard_1"]
+    assert stats["shard_1"]["size"] == config.DB_POOL_SIZE
+
+
+@pytest.mark.anyio
+async def test_make_engine_applies_pool_settings(tmp_path):
+    engine = make_engine(f"sqlite+aiosqlite:///{tmp_path}/pool.db")
+    assert isinstance(engine.pool, TimedQueuePool)
+    assert engine.pool.size() == config.DB_POOL_SIZE
+    assert engine.pool.timeout() == config.DB_POOL_TIMEOUT
+
+    async with engine.connect():
+        assert engine.pool.checkedout() == 1
+    assert engine.pool.wait_count == 1
+    await engine.dispose()
+
+    # In-memory SQLite keeps its single connection pool
+    engine = make_engine("sqlite+aiosqlite://")
+    assert not isinstance(engine.pool, TimedQueuePool)
+    await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_metrics(client: AsyncClient, auth_headers):
+    await client.post(
+        "/api/v1/auth/signup",
+        json={"email": "metrics@example.com", "password": "password"},
+    )
+    headers = await auth_headers("metrics@example.com")
+    for _ in range(2):
+        await client.get("/api/v1/tasks/", headers=headers)
+    await client.get("/api/v1/tasks/123", headers=headers)
+
+    response = await client.get("/api/v1/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+
+    # Labelled with the route template, not the raw path
+    route = 'method="GET",route="/api/v1/tasks/{task_id}",status="404"'
+    assert f"http_request_duration_seconds_count{{{route}}} 1" in lines
+    route = 'method="GET",route="/api/v1/tasks/"'
+    [count] = [
+        line
+        for line in lines
+        if line.startswith(f"http_request_db_statements_count{{{route}}}")
+    ]
+    assert int(count.split()[-1]) >= 2
+    [statements] = [
+        line
+        for line in lines
+        if line.startswith(f"http_request_db_statements_sum{{{route}}}")
+    ]
+    assert float(statements.split()[-1]) > 0
+    assert any(
+        line.startswith(
+            'password_hashing_duration_seconds_count{operation="hash_password"}'
+        )
+        for line in lines
+    )
+
+
+@pytest.mark.anyio
+async def test_internal_routes_are_guarded(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(config, "INTERNAL_ENDPOINTS_ENABLED", False)
+    for path in ("/api/v1/internal/cache-stats", "/api/v1/metrics"):
+        response = await client.get(path)
+        assert response.status_code == 404
+
+    monkeypatch.setattr(config, "INTERNAL_ENDPOINTS_ENABLED", True)
+    monkeypatch.setattr(config, "INTERNAL_API_TOKEN", "scrape-me")
+    for path in ("/api/v1/internal/cache-stats", "/api/v1/metrics"):
+        response = await client.get(path)
+        assert response.status_code == 401
+        response = await client.get(
+            path, headers={"Authorization": "Bearer not-the-token"}
+        )
+        assert response.status_code == 401
+        response = await client.get(path, headers={"Authorization": "Bearer scrape-me"})
+        assert response.status_code == 200
@@ -0,0 +1,40 @@
+import logging
+
+import pytest
+from asgi_correlation_id import CorrelationIdFilter
+from httpx import AsyncClient
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+
+
+@pytest.mark.anyio
+async def test_slow_queries_are_logged_with_request_id(
+    client: AsyncClient, auth_headers, caplog, monkeypatch
+):
+    headers = await auth_headers("logging@example.com")
+    # Every statement counts as slow
+    monkeypatch.setattr(config, "SQL_SLOW_QUERY_MS", 0)
+    caplog.handler.addFilter(CorrelationIdFilter())
+
+    with caplog.at_level(logging.INFO, logger="app.db.query_logging"):
+        response = await client.get("/api/v1/tasks/", headers=headers)
+    assert response.status_code == 200
+
+    records = [r for r in caplog.records if r.name == "app.db.query_logging"]
+    assert records
+    for record in records:
+        assert record.getMessage() == "slow query"
+        assert record.duration_ms >= 0
+        assert "tasks" in record.statement or "users" in record.statement
+        assert record.correlation_id == response.headers["X-Request-ID"]
+
+
+@pytest.mark.anyio
+async def test_failed_queries_leave_no_timer(db_session: AsyncSession):
+    connection = await db_session.connection()
+    with pytest.raises(DBAPIError):
+        await connection.exec_driver_sql("SELECT * FROM no_such_table")
+    # The start time went away with the statement
+    assert not connection.info.get("query_start_time")
@@ -0,0 +1,62 @@
+import logging
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.core.metrics import RequestStats
+from app.db.base import Task
+from app.db.query_budget import QueryBudgetExceeded, check_query_budget
+
+SELECT_TASK = "SELECT tasks.id FROM tasks WHERE tasks.id = ?"
+
+
+@pytest.mark.anyio
+async def test_query_budget():
+    settings = config.model_copy(update={"SQL_QUERY_BUDGET_MODE": "raise"})
+    stats = RequestStats(route="/tasks", query_budget=2)
+    check_query_budget(stats, "SELECT 1", settings)
+    # Savepoints aren't queries
+    check_query_budget(stats, "RELEASE SAVEPOINT sa_savepoint_1", settings)
+    check_query_budget(stats, "SELECT 2", settings)
+    with pytest.raises(QueryBudgetExceeded, match="budget of 2 queries"):
+        check_query_budget(stats, "SELECT 3", settings)
+
+
+@pytest.mark.anyio
+async def test_repeated_queries_are_flagged(caplog):
+    settings = config.model_copy(
+        update={"SQL_QUERY_BUDGET_MODE": "raise", "SQL_N_PLUS_ONE_THRESHOLD": 3}
+    )
+    stats = RequestStats(route="/tasks")
+    for _ in range(2):
+        check_query_budget(stats, SELECT_TASK, settings)
+    with pytest.raises(QueryBudgetExceeded, match="same query 3 times"):
+        check_query_budget(stats, SELECT_TASK, settings)
+
+    # Batching routes opt out
+    stats = RequestStats(route="/tasks/import", allow_repeated_queries=True)
+    for _ in range(5):
+        check_query_budget(stats, SELECT_TASK, settings)
+
+    # Only logged in warn mode, once
+    settings.SQL_QUERY_BUDGET_MODE = "warn"
+    stats = RequestStats(route="/tasks")
+    with caplog.at_level(logging.WARNING, logger="app.db.query_budget"):
+        for _ in range(5):
+            check_query_budget(stats, SELECT_TASK, settings)
+    [record] = caplog.records
+    assert record.getMessage() == "/tasks sent the same query 3 times (N+1?)"
+    assert record.statement == SELECT_TASK
+
+
+@pytest.mark.anyio
+async def test_lazy_loads_raise(client, auth_headers, db_session: AsyncSession):
+    headers = await auth_headers("lazy@example.com")
+    await client.post("/api/v1/tasks/", headers=headers, json={"title": "Lazy"})
+
+    task = await db_session.scalar(select(Task))
+    with pytest.raises(InvalidRequestError, match="lazy='raise'"):
+        task.owner
@@ -1,5 +1,23 @@
+import base64
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta, timezone
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.api.deps import recent_writers
+from app.api.v1.endpoints.tasks import task_response_cache
+from app.core.config import config
+from app.db.base import Base, Task, TaskTombstone, User
+from app.db.session import get_replica_db
+from app.db.shards import ShardRouter
+from app.db.sync import prune_tombstones
+from app.main import app
 
 
 @pytest.mark.anyio
@@ -123,3 +141,705 @@ async def test_search_and_filter_tasks(client: AsyncClient, auth_headers):
     # Test 3: Pagination (Limit 1)
     res = await client.get("/api/v1/tasks/?limit=1", headers=headers)
     assert len(res.json()) == 1
+
+
+@pytest.mark.anyio
+async def test_cursor_pagination(client: AsyncClient, auth_headers):
+    email = "cursor@example.com"
+    await client.post(
+        "/api/v1/auth/signup",
+        json={"email": email, "password": "password"},
+    )
+    headers = await auth_headers(email)
+
+    titles = [f"Task {i}" for i in range(5)]
+    for title in titles:
+        await client.post("/api/v1/tasks/", headers=headers, json={"title": title})
+
+    # Walk forward two tasks at a time following the next cursor
+    seen = []
+    res = await client.get("/api/v1/tasks/?limit=2", headers=headers)
+    while True:
+        assert res.status_code == 200
+        seen.extend(task["title"] for task in res.json())
+        cursor = res.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        res = await client.get(
+            f"/api/v1/tasks/?limit=2&after={cursor}", headers=headers
+        )
+    assert seen == titles
+
+    # Walk back from the last page
+    res = await client.get(
+        f"/api/v1/tasks/?limit=2&before={res.headers['X-Prev-Cursor']}",
+        headers=headers,
+    )
+    assert [task["title"] for task in res.json()] == ["Task 2", "Task 3"]
+
+    # Garbage cursors are rejected
+    res = await client.get("/api/v1/tasks/?after=not-a-cursor", headers=headers)
+    assert res.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_search_tasks_by_relevance(client: AsyncClient, auth_headers):
+    email = "search@example.com"
+    await client.post(
+        "/api/v1/auth/signup",
+        json={"email": email, "password": "password"},
+    )
+    headers = await auth_headers(email)
+
+    await client.post(
+        "/api/v1/tasks/",
+        headers=headers,
+        json={"title": "Call the plumber", "description": "about the kitchen sink"},
+    )
+    await client.post("/api/v1/tasks/", headers=headers, json={"title": "Sink"})
+    await client.post("/api/v1/tasks/", headers=headers, json={"title": "Read"})
+
+    # Matches on title and description, substrings included
+    res = await client.get("/api/v1/tasks/?search=sin", headers=headers)
+    assert res.status_code == 200
+    data = res.json()
+    assert {task["title"] for task in data} == {"Call the plumber", "Sink"}
+    assert data[0]["title"] == "Sink"
+
+    # Terms too short for the index still work
+    res = await client.get("/api/v1/tasks/?search=ea", headers=headers)
+    assert {task["title"] for task in res.json()} == {"Read"}
+
+
+@pytest.mark.anyio
+async def test_update_task(client: AsyncClient, auth_headers):
+    email = "update@example.com"
+    await client.post(
+        "/api/v1/auth/signup",
+        json={"email": email, "password": "password"},
+    )
+    headers = await auth_headers(email)
+
+    res = await client.post("/api/v1/tasks/", headers=headers, json={"title": "Old"})
+    created = res.json()
+
+    res = await client.patch(
+        f"/api/v1/tasks/{created['id']}",
+        headers=headers,
+        json={"title": "New", "completed": True},
+    )
+    assert res.status_code == 200
+    updated = res.json()
+    assert updated["title"] == "New"
+    assert updated["completed"] is True
+    assert updated["created_at"] == created["created_at"]
+    assert updated["updated_at"] > created["updated_at"]
+
+    res = await client.get(f"/api/v1/tasks/{created['id']}", headers=headers)
+    assert res.json() == updated
+
+    # An empty patch leaves the task alone
+    res = await client.patch(f"/api/v1/tasks/{created['id']}", headers=headers, json={})
+    assert res.json() == updated
+
+
+@pytest.mark.anyio
+async def test_delete_task(client: AsyncClient, auth_headers, assert_query_count):
+    email = "delete@example.com"
+    await client.post(
+        "/api/v1/auth/signup",
+        json={"email": email, "password": "password"},
+    )
+    headers = await auth_headers(email)
+    res = await client.post("/api/v1/tasks/", headers=headers, json={"title": "Bye"})
+    task_id = res.json()["id"]
+
+    # The user is cached by now, deleting is a single DELETE ... RETURNING,
+    # the tombstone for delta sync is written by a trigger
+    with assert_query_count(1) as statements:
+        res = await client.delete(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert res.status_code == 204
+    assert statements[0].startswith("DELETE FROM tasks")
+    res = await client.get("/api/v1/tasks/changes", headers=headers)
+    assert res.json()["deleted"] == [task_id]
+
+    res = await client.delete(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert res.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_create_task_query_count(
+    client: AsyncClient, auth_headers, assert_query_count
+):
+    headers = await auth_headers("create@example.com")
+    await client.get("/api/v1/users/me", headers=headers)
+
+    # No refresh after the insert, RETURNING gives the whole row
+    with assert_query_count(1):
+        res = await client.post(
+            "/api/v1/tasks/", headers=headers, json={"title": "One trip"}
+        )
+    assert res.status_code == 201
+    data = res.json()
+    assert data["completed"] is False
+    assert data["created_at"] is not None
+
+
+@pytest.mark.anyio
+async def test_task_reads_skip_the_identity_map(
+    client: AsyncClient, auth_headers, db_session: AsyncSession
+):
+    headers = await auth_headers("rows@example.com")
+    res = await client.post("/api/v1/tasks/", headers=headers, json={"title": "Row"})
+    task = res.json()
+
+    res = await client.get("/api/v1/tasks/", headers=headers)
+    assert res.json() == [task]
+    res = await client.get(f"/api/v1/tasks/{task['id']}", headers=headers)
+    assert res.json() == task
+    res = await client.patch(
+        f"/api/v1/tasks/{task['id']}", headers=headers, json={"completed": True}
+    )
+    assert res.json()["completed"] is True
+
+    # Tasks are read as plain rows, no Task entity was ever loaded
+    assert not [
+        obj for obj in db_session.identity_map.values() if isinstance(obj, Task)
+    ]
+
+
+@pytest.mark.anyio
+async def test_conditional_get(client: AsyncClient, auth_headers, assert_query_count):
+    headers = await auth_headers("etag@example.com")
+    res = await client.post("/api/v1/tasks/", headers=headers, json={"title": "One"})
+    task_id = res.json()["id"]
+
+    res = await client.get("/api/v1/tasks/", headers=headers)
+    list_etag = res.headers["ETag"]
+    assert list_etag.startswith('W/"')
+    res = await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    task_etag = res.headers["ETag"]
+
+    # Nothing changed, the list is answered from the aggregate query alone
+    # (test_cached_conditional_get covers a response cache hit)
+    await task_response_cache.clear()
+    with assert_query_count(1):
+        res = await client.get(
+            "/api/v1/tasks/", headers={**headers, "If-None-Match": list_etag}
+        )
+    assert res.status_code == 304
+    assert res.content == b""
+    assert res.headers["ETag"] == list_etag
+    res = await client.get(
+        f"/api/v1/tasks/{task_id}",
+        headers={**headers, "If-None-Match": f'"other", {task_etag}'},
+    )
+    assert res.status_code == 304
+
+    # Another page of the list has its own tag
+    res = await client.get(
+        "/api/v1/tasks/?completed=true",
+        headers={**headers, "If-None-Match": list_etag},
+    )
+    assert res.status_code == 200
+
+    # Any write moves both tags
+    await client.patch(
+        f"/api/v1/tasks/{task_id}", headers=headers, json={"completed": True}
+    )
+    res = await client.get(
+        "/api/v1/tasks/", headers={**headers, "If-None-Match": list_etag}
+    )
+    assert res.status_code == 200
+    assert res.headers["ETag"] != list_etag
+    res = await client.get(
+        f"/api/v1/tasks/{task_id}", headers={**headers, "If-None-Match": task_etag}
+    )
+    assert res.status_code == 200
+    assert res.json()["completed"] is True
+
+    await client.post("/api/v1/tasks/", headers=headers, json={"title": "Two"})
+    res = await client.get("/api/v1/tasks/", headers=headers)
+    list_etag = res.headers["ETag"]
+    await client.delete(f"/api/v1/tasks/{task_id}", headers=headers)
+    res = await client.get(
+        "/api/v1/tasks/", headers={**headers, "If-None-Match": list_etag}
+    )
+    assert res.status_code == 200
+    assert [task["title"] for task in res.json()] == ["Two"]
+
+
+@pytest.mark.anyio
+async def test_task_changes(client: AsyncClient, auth_headers):
+    headers = await auth_headers("sync@example.com")
+    ids = []
+    for title in ("A", "B", "C"):
+        res = await client.post(
+            "/api/v1/tasks/", headers=headers, json={"title": title}
+        )
+        ids.append(res.json()["id"])
+
+    # First sync, everything in pages
+    res = await client.get("/api/v1/tasks/changes?limit=2", headers=headers)
+    changes = res.json()
+    assert [task["title"] for task in changes["changed"]] == ["A", "B"]
+    assert changes["has_more"] is True
+    res = await client.get(
+        f"/api/v1/tasks/changes?limit=2&since={changes['sync_token']}",
+        headers=headers,
+    )
+    changes = res.json()
+    assert [task["title"] for task in changes["changed"]] == ["C"]
+    assert changes["deleted"] == []
+    assert changes["has_more"] is False
+    token = changes["sync_token"]
+
+    # Nothing new, the token stays the same
+    res = await client.get(f"/api/v1/tasks/changes?since={token}", headers=headers)
+    assert res.json() == {
+        "changed": [],
+        "deleted": [],
+        "sync_token": token,
+        "has_more": False,
+    }
+
+    await client.patch(f"/api/v1/tasks/{ids[0]}", headers=headers, json={"title": "A2"})
+    await client.delete(f"/api/v1/tasks/{ids[1]}", headers=headers)
+    await client.request(
+        "DELETE", "/api/v1/tasks/bulk", headers=headers, json={"ids": [ids[2]]}
+    )
+    res = await client.get(f"/api/v1/tasks/changes?since={token}", headers=headers)
+    changes = res.json()
+    assert [task["title"] for task in changes["changed"]] == ["A2"]
+    assert changes["deleted"] == [ids[1], ids[2]]
+
+    res = await client.get("/api/v1/tasks/changes?since=garbage", headers=headers)
+    assert res.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_task_changes_follow_commit_order(
+    client: AsyncClient, auth_headers, db_session: AsyncSession
+):
+    headers = await auth_headers("sync_order@example.com")
+    await client.post("/api/v1/tasks/", headers=headers, json={"title": "A"})
+    res = await client.get("/api/v1/tasks/changes", headers=headers)
+    token = res.json()["sync_token"]
+    owner_id = res.json()["changed"][0]["owner_id"]
+
+    # Stamped before the token's change (a slow transaction or a late
+    # clock) but committed after it
+    long_ago = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    db_session.add(
+        Task(
+            title="Late",
+            owner_id=owner_id,
+            created_at=long_ago,
+            updated_at=long_ago,
+        )
+    )
+    await db_session.commit()
+    res = await client.get(f"/api/v1/tasks/changes?since={token}", headers=headers)
+    assert [task["title"] for task in res.json()["changed"]] == ["Late"]
+
+    # Tokens from the timestamp ordering ask for a full sync
+    legacy = base64.urlsafe_b64encode(
+        json.dumps([long_ago.isoformat(), 0, 1]).encode()
+    ).decode()
+    res = await client.get(f"/api/v1/tasks/changes?since={legacy}", headers=headers)
+    assert res.status_code == 410
+
+
+@pytest.mark.anyio
+async def test_pruned_tombstones_expire_sync_tokens(
+    client: AsyncClient, auth_headers, db_session: AsyncSession
+):
+    headers = await auth_headers("sync_prune@example.com")
+    res = await client.post("/api/v1/tasks/", headers=headers, json={"title": "A"})
+    task_id = res.json()["id"]
+    token = (await client.get("/api/v1/tasks/changes", headers=headers)).json()[
+        "sync_token"
+    ]
+    await client.delete(f"/api/v1/tasks/{task_id}", headers=headers)
+
+    conn = await db_session.connection()
+    assert await prune_tombstones(conn, timedelta(days=30)) == 0
+    await conn.execute(
+        update(TaskTombstone).values(
+            deleted_at=datetime.now(timezone.utc) - timedelta(days=31)
+        )
+    )
+    assert await prune_tombstones(conn, timedelta(days=30)) == 1
+
+    # The client may have missed the delete, it has to sync from scratch
+    res = await client.get(f"/api/v1/tasks/changes?since={token}", headers=headers)
+    assert res.status_code == 410
+    res = await client.get("/api/v1/tasks/changes", headers=headers)
+    assert res.json() == {
+        "changed": [],
+        "deleted": [],
+        "sync_token": None,
+        "has_more": False,
+    }
+
+
+@pytest.mark.anyio
+async def test_task_stats(client: AsyncClient, auth_headers, assert_query_count):
+    headers = await auth_headers("stats@example.com")
+    res = await client.get("/api/v1/tasks/stats", headers=headers)
+    assert res.json() == {"total": 0, "completed": 0, "open": 0, "by_day": None}
+
+    for title in ("Read", "Write", "Ready"):
+        res = await client.post(
+            "/api/v1/tasks/", headers=headers, json={"title": title}
+        )
+    await client.patch(
+        f"/api/v1/tasks/{res.json()['id']}", headers=headers, json={"completed": True}
+    )
+
+    with assert_query_count(1):
+        res = await client.get("/api/v1/tasks/stats?by_day=true", headers=headers)
+    stats = res.json()
+    assert (stats["total"], stats["completed"], stats["open"]) == (3, 1, 2)
+    [day] = stats["by_day"]
+    assert date.fromisoformat(day["day"])
+    assert (day["total"], day["completed"]) == (3, 1)
+
+    # The list reports the total of what it is paging through
+    res = await client.get("/api/v1/tasks/?limit=1", headers=headers)
+    assert res.headers["X-Total-Count"] == "3"
+    res = await client.get(
+        f"/api/v1/tasks/?limit=1&after={res.headers['X-Next-Cursor']}",
+        headers=headers,
+    )
+    assert res.headers["X-Total-Count"] == "3"
+    res = await client.get("/api/v1/tasks/?limit=1&search=rea", headers=headers)
+    assert res.headers["X-Total-Count"] == "2"
+    res = await client.get("/api/v1/tasks/?completed=true&skip=5", headers=headers)
+    assert "X-Total-Count" not in res.headers
+
+
+@pytest.mark.anyio
+async def test_task_response_cache(
+    client: AsyncClient, auth_headers, assert_query_count
+):
+    headers = await auth_headers("cached@example.com")
+    other_headers = await auth_headers("cached_other@example.com")
+    res = await client.post("/api/v1/tasks/", headers=headers, json={"title": "One"})
+    task_id = res.json()["id"]
+
+    first = await client.get("/api/v1/tasks/?limit=5", headers=headers)
+    with assert_query_count(0):
+        res = await client.get("/api/v1/tasks/?limit=5", headers=headers)
+    assert res.json() == first.json()
+    assert res.headers["ETag"] == first.headers["ETag"]
+    assert res.headers["X-Total-Count"] == "1"
+    await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+
+    # Entries are per owner
+    res = await client.get("/api/v1/tasks/?limit=5", headers=other_headers)
+    assert res.json() == []
+    res = await client.get(f"/api/v1/tasks/{task_id}", headers=other_headers)
+    assert res.status_code == 404
+
+    # Every write drops the owner's responses
+    await client.post("/api/v1/tasks/", headers=headers, json={"title": "Two"})
+    res = await client.get("/api/v1/tasks/?limit=5", headers=headers)
+    assert [task["title"] for task in res.json()] == ["One", "Two"]
+    await client.patch(f"/api/v1/tasks/{task_id}", headers=headers, json={"title": "1"})
+    res = await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert res.json()["title"] == "1"
+    await client.delete(f"/api/v1/tasks/{task_id}", headers=headers)
+    res = await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert res.status_code == 404
+
+    stats = (await client.get("/api/v1/internal/cache-stats")).json()
+    assert stats["task_responses"]["hits"] == 1
+    assert stats["task_responses"]["bytes"] > 0
+
+
+@pytest.mark.anyio
+async def test_cached_conditional_get(
+    client: AsyncClient, auth_headers, assert_query_count
+):
+    headers = await auth_headers("cached_etag@example.com")
+    await client.post("/api/v1/tasks/", headers=headers, json={"title": "One"})
+    res = await client.get("/api/v1/tasks/", headers=headers)
+    list_etag = res.headers["ETag"]
+
+    # Straight from the response cache, not even the aggregate query
+    with assert_query_count(0):
+        res = await client.get(
+            "/api/v1/tasks/", headers={**headers, "If-None-Match": list_etag}
+        )
+    assert res.status_code == 304
+    assert res.content == b""
+    assert res.headers["ETag"] == list_etag
+
+
+@pytest.mark.anyio
+async def test_task_response_cache_needs_a_shared_backend(
+    client: AsyncClient, auth_headers, assert_query_count, monkeypatch
+):
+    # Several workers with their own backend would miss each other's writes
+    monkeypatch.setattr(config, "CACHE_ALLOW_IN_PROCESS", False)
+    headers = await auth_headers("uncached@example.com")
+    await client.get("/api/v1/tasks/", headers=headers)
+    # Neither is the user cached
+    with assert_query_count(3):
+        res = await client.get("/api/v1/tasks/", headers=headers)
+    assert res.status_code == 200
+    stats = (await client.get("/api/v1/internal/cache-stats")).json()
+    assert stats["task_responses"]["hits"] == 0
+
+
+@pytest.mark.anyio
+async def test_reads_go_to_the_replica(
+    client: AsyncClient, auth_headers, db_session: AsyncSession, replica_session
+):
+    app.dependency_overrides[get_replica_db] = lambda: replica_session
+    headers = await auth_headers("replica@example.com")
+    user = (
+        await db_session.execute(
+            select(User).where(User.email == "replica@example.com")
+        )
+    ).scalar_one()
+    # The replica has caught up with the user but not with the task below
+    replica_session.add(
+        User(id=user.id, email=user.email, hashed_password=user.hashed_password)
+    )
+    await replica_session.commit()
+
+    res = await client.post("/api/v1/tasks/", headers=headers, json={"title": "New"})
+    task_id = res.json()["id"]
+
+    # Right after writing, the user reads from the primary
+    res = await client.get("/api/v1/tasks/", headers=headers)
+    assert [task["title"] for task in res.json()] == ["New"]
+    res = await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert res.status_code == 200
+
+    # Once the window is over, reads are served by the replica
+    await recent_writers.clear()
+    await task_response_cache.clear()
+    res = await client.get("/api/v1/tasks/", headers=headers)
+    assert res.json() == []
+    res = await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert res.status_code == 404
+    res = await client.get("/api/v1/users/me", headers=headers)
+    assert res.json()["email"] == "replica@example.com"
+
+
+@pytest.mark.anyio
+async def test_reads_stay_on_the_primary_without_a_shared_backend(
+    client: AsyncClient, auth_headers, replica_session, monkeypatch
+):
+    # Another worker may have handled the user's last write
+    monkeypatch.setattr(config, "CACHE_ALLOW_IN_PROCESS", False)
+    app.dependency_overrides[get_replica_db] = lambda: replica_session
+    headers = await auth_headers("no_shared_backend@example.com")
+    await client.post("/api/v1/tasks/", headers=headers, json={"title": "New"})
+    await recent_writers.clear()
+
+    res = await client.get("/api/v1/tasks/", headers=headers)
+    assert [task["title"] for task in res.json()] == ["New"]
+
+
+@pytest.mark.anyio
+async def test_tasks_are_sharded_by_owner(
+    client: AsyncClient, auth_headers, monkeypatch, tmp_path
+):
+    shards = ShardRouter(
+        [f"sqlite+aiosqlite:///{tmp_path}/shard_{i}.db" for i in range(2)]
+    )
+    for engine in shards.engines:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(deps, "task_shards", shards)
+
+    # Users with consecutive ids land on different shards
+    headers = [await auth_headers(f"shard_{i}@example.com") for i in range(2)]
+    for i, owner_headers in enumerate(headers):
+        res = await client.post(
+            "/api/v1/tasks/", headers=owner_headers, json={"title": f"Task {i}"}
+        )
+        assert res.status_code == 201
+        res = await client.get("/api/v1/tasks/", headers=owner_headers)
+        assert [task["title"] for task in res.json()] == [f"Task {i}"]
+
+    owner_shards = set()
+    for engine in shards.engines:
+        async with engine.connect() as conn:
+            owners = (await conn.execute(select(Task.owner_id))).scalars().all()
+        assert len(owners) == 1
+        assert shards.engine_for(owners[0]) is engine
+        owner_shards.add(owners[0] % 2)
+    assert owner_shards == {0, 1}
+    await shards.dispose()
+
+
+@pytest.mark.anyio
+async def test_bulk_create_is_one_insert(
+    client: AsyncClient, auth_headers, assert_query_count
+):
+    headers = await auth_headers("bulk_insert@example.com")
+    await client.get("/api/v1/users/me", headers=headers)
+
+    with assert_query_count(1) as statements:
+        res = await client.post(
+            "/api/v1/tasks/bulk",
+            headers=headers,
+            json=[{"title": f"Bulk {i}"} for i in range(10)],
+        )
+    assert res.status_code == 201
+    assert [task["title"] for task in res.json()] == [f"Bulk {i}" for i in range(10)]
+    # A single multi-row INSERT, not one per task
+    assert [s.split("(")[0] for s in statements] == ["INSERT INTO tasks "]
+
+
+@pytest.mark.anyio
+async def test_bulk_tasks(client: AsyncClient, auth_headers, assert_query_count):
+    headers = await auth_headers("bulk@example.com")
+    other_headers = await auth_headers("bulk_other@example.com")
+    res = await client.post(
+        "/api/v1/tasks/", headers=other_headers, json={"title": "Not yours"}
+    )
+    other_id = res.json()["id"]
+
+    res = await client.post(
+        "/api/v1/tasks/bulk",
+        headers=headers,
+        json=[{"title": f"Bulk {i}"} for i in range(3)],
+    )
+    assert res.status_code == 201
+    created = res.json()
+    assert [task["title"] for task in created] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+    ids = [task["id"] for task in created]
+
+    with assert_query_count(1):
+        res = await client.patch(
+            "/api/v1/tasks/bulk",
+            headers=headers,
+            json=[
+                {"id": ids[0], "completed": True},
+                {"id": ids[1], "title": "Renamed", "description": "New"},
+                {"id": other_id, "title": "Hacked"},
+            ],
+        )
+    assert res.status_code == 200
+    results = res.json()
+    assert [result["status"] for result in results] == [
+        "updated",
+        "updated",
+        "not_found",
+    ]
+    assert results[0]["task"]["completed"] is True
+    assert results[0]["task"]["title"] == "Bulk 0"
+    assert results[1]["task"]["title"] == "Renamed"
+    assert results[1]["task"]["description"] == "New"
+    assert results[1]["task"]["completed"] is False
+
+    res = await client.request(
+        "DELETE",
+        "/api/v1/tasks/bulk",
+        headers=headers,
+        json={"ids": [ids[0], ids[2], other_id]},
+    )
+    assert res.status_code == 200
+    assert [result["status"] for result in res.json()] == [
+        "deleted",
+        "deleted",
+        "not_found",
+    ]
+    res = await client.get(f"/api/v1/tasks/{other_id}", headers=other_headers)
+    assert res.status_code == 200
+
+    # Empty batches are rejected
+    res = await client.post("/api/v1/tasks/bulk", headers=headers, json=[])
+    assert res.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_export_tasks(client: AsyncClient, auth_headers):
+    headers = await auth_headers("export@example.com")
+    await client.post(
+        "/api/v1/tasks/bulk",
+        headers=headers,
+        json=[{"title": "First"}, {"title": "Second, with a comma"}],
+    )
+
+    res = await client.get("/api/v1/tasks/export", headers=headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert [row["title"] for row in rows] == ["First", "Second, with a comma"]
+
+    res = await client.get("/api/v1/tasks/export?format=csv", headers=headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert [row["title"] for row in rows] == ["First", "Second, with a comma"]
+
+
+@pytest.mark.anyio
+async def test_import_tasks(client: AsyncClient, auth_headers):
+    headers = await auth_headers("import@example.com")
+
+    ndjson = (
+        '{"title": "From NDJSON", "description": "one"}\n'
+        "\n"
+        '{"title": ""}\n'
+        "not json\n"
+        '{"title": "Another"}\n'
+    )
+    res = await client.post(
+        "/api/v1/tasks/import",
+        headers=headers,
+        files={"file": ("tasks.ndjson", ndjson.encode(), "application/x-ndjson")},
+    )
+    assert res.status_code == 200
+    result = res.json()
+    assert result["imported"] == 2
+    assert result["failed"] == 2
+    assert [error["line"] for error in result["errors"]] == [3, 4]
+
+    csv_data = 'title,description\nFrom CSV,\n"Quoted, title","multi\nline"\n'
+    res = await client.post(
+        "/api/v1/tasks/import",
+        headers=headers,
+        files={"file": ("tasks.csv", csv_data.encode(), "text/csv")},
+    )
+    assert res.json() == {"imported": 2, "failed": 0, "errors": []}
+
+    res = await client.get("/api/v1/tasks/?limit=10", headers=headers)
+    tasks = {task["title"]: task["description"] for task in res.json()}
+    assert tasks == {
+        "From NDJSON": "one",
+        "Another": None,
+        "From CSV": None,
+        "Quoted, title": "multi\nline",
+    }
+
+
+@pytest.mark.anyio
+async def test_import_reports_the_rows_imported_before_an_unreadable_line(
+    client: AsyncClient, auth_headers, monkeypatch
+):
+    headers = await auth_headers("import_broken@example.com")
+    monkeypatch.setattr(config, "TASKS_IMPORT_CHUNK_SIZE", 2)
+
+    # The first chunk is committed before the bad bytes are read
+    ndjson = b'{"title": "One"}\n{"title": ""}\n{"title": "Three"}\n\xff\n'
+    res = await client.post(
+        "/api/v1/tasks/import",
+        headers=headers,
+        files={"file": ("tasks.ndjson", ndjson, "application/x-ndjson")},
+    )
+    assert res.status_code == 422
+    detail = res.json()["detail"]
+    assert detail["message"].startswith("Could not read the file")
+    assert detail["imported"] == 1
+    assert detail["failed"] == 1
+
+    res = await client.get("/api/v1/tasks/", headers=headers)
+    assert [task["title"] for task in res.json()] == ["One"]
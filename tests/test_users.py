@@ -1,5 +1,13 @@
+import asyncio
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import config
+from app.core.security import user_cache
+from app.db.base import User
 
 
 @pytest.mark.anyio
@@ -30,3 +38,69 @@ async def test_users_me_success(client: AsyncClient, auth_headers):
     assert response.status_code == 200
     data = response.json()
     assert data["email"] == email
+
+
+@pytest.mark.anyio
+async def test_users_me_is_cached(
+    client: AsyncClient, auth_headers, db_session: AsyncSession
+):
+    email = "cached@example.com"
+    await client.post(
+        "/api/v1/auth/signup",
+        json={"email": email, "password": "password"},
+    )
+    headers = await auth_headers(email)
+
+    for _ in range(3):
+        response = await client.get("/api/v1/users/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["email"] == email
+
+    # Only the first request had to load the user
+    response = await client.get("/api/v1/internal/cache-stats")
+    assert response.json()["users"] == {"hits": 2, "misses": 1}
+
+    # Changing the row drops the cached copy
+    user = await db_session.scalar(select(User).where(User.email == email))
+    user.confirmed = True
+    await db_session.commit()
+    await asyncio.sleep(0)
+
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.json()["confirmed"] is True
+
+
+@pytest.mark.anyio
+async def test_user_cache_needs_a_shared_backend(
+    client: AsyncClient, auth_headers, assert_query_count, monkeypatch
+):
+    # Another worker's cached copy would outlive a change committed here
+    monkeypatch.setattr(config, "CACHE_ALLOW_IN_PROCESS", False)
+    headers = await auth_headers("uncached_user@example.com")
+    await client.get("/api/v1/users/me", headers=headers)
+
+    with assert_query_count(1):
+        response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    response = await client.get("/api/v1/internal/cache-stats")
+    assert response.json()["users"] == {"hits": 0, "misses": 0}
+
+
+@pytest.mark.anyio
+async def test_cached_user_is_dropped_on_commit(
+    client: AsyncClient, auth_headers, db_session: AsyncSession
+):
+    email = "stale@example.com"
+    headers = await auth_headers(email)
+    await client.get("/api/v1/users/me", headers=headers)
+    assert await user_cache.get(email) is not None
+
+    # Until the commit other requests still read the old row, the cached
+    # copy stays
+    user = await db_session.scalar(select(User).where(User.email == email))
+    user.confirmed = True
+    await db_session.flush()
+    assert await user_cache.get(email) is not None
+
+    await db_session.commit()
+    assert await user_cache.get(email) is None